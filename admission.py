@@ -0,0 +1,123 @@
+import logging
+import threading
+import time
+from collections import Counter
+
+from config import (
+    MAX_LISTENERS_PER_IP,
+    MAX_LISTENERS_PER_USER,
+    MAX_LISTENERS_PER_CHANNEL,
+    MAX_LISTENERS_TOTAL,
+)
+
+logger = logging.getLogger("radio.admission")
+
+
+class ListenerTicket:
+    """A granted listener slot. Call release() exactly once; extra calls are no-ops."""
+
+    def __init__(self, controller: "AdmissionController", ip: str, user_id, channel: str):
+        self._controller = controller
+        self.ip = ip
+        self.user_id = user_id
+        self.channel = channel
+        self.admitted_at = time.time()
+        self._released = False
+
+    def release(self):
+        self._controller._release(self)
+
+
+class AdmissionController:
+    """Concurrent listener quotas per IP, per user, per channel and per process.
+
+    A limit of 0 disables that quota. All counters live in plain dicts guarded
+    by a single lock; admission and release are O(1).
+    """
+
+    def __init__(
+        self,
+        per_ip: int = MAX_LISTENERS_PER_IP,
+        per_user: int = MAX_LISTENERS_PER_USER,
+        per_channel: int = MAX_LISTENERS_PER_CHANNEL,
+        total: int = MAX_LISTENERS_TOTAL,
+    ):
+        self.per_ip = per_ip
+        self.per_user = per_user
+        self.per_channel = per_channel
+        self.total = total
+
+        self._lock = threading.Lock()
+        self._by_ip: Counter = Counter()
+        self._by_user: Counter = Counter()
+        self._by_channel: Counter = Counter()
+        self._active = 0
+        self._admitted = 0
+        self._rejected: Counter = Counter()
+
+    def try_admit(self, ip: str, user_id, channel: str) -> tuple[ListenerTicket | None, str]:
+        """Reserve a listener slot.
+
+        Returns (ticket, "") on success or (None, reason) when a quota is full.
+        """
+        with self._lock:
+            reason = ""
+            if self.total and self._active >= self.total:
+                reason = "server"
+            elif self.per_channel and self._by_channel[channel] >= self.per_channel:
+                reason = "channel"
+            elif self.per_ip and self._by_ip[ip] >= self.per_ip:
+                reason = "ip"
+            elif user_id and self.per_user and self._by_user[user_id] >= self.per_user:
+                reason = "user"
+
+            if reason:
+                self._rejected[reason] += 1
+                return None, reason
+
+            self._active += 1
+            self._admitted += 1
+            self._by_ip[ip] += 1
+            self._by_channel[channel] += 1
+            if user_id:
+                self._by_user[user_id] += 1
+
+        return ListenerTicket(self, ip, user_id, channel), ""
+
+    def _release(self, ticket: ListenerTicket):
+        with self._lock:
+            # Checked under the lock: the stream generator and its background
+            # task may both release the same ticket concurrently.
+            if ticket._released:
+                return
+            ticket._released = True
+            self._active -= 1
+            self._decrement(self._by_ip, ticket.ip)
+            self._decrement(self._by_channel, ticket.channel)
+            if ticket.user_id:
+                self._decrement(self._by_user, ticket.user_id)
+
+    @staticmethod
+    def _decrement(counter: Counter, key):
+        counter[key] -= 1
+        if counter[key] <= 0:
+            del counter[key]
+
+    def stats(self, top: int = 10) -> dict:
+        """Snapshot of current counters for monitoring."""
+        with self._lock:
+            return {
+                "active": self._active,
+                "admitted_total": self._admitted,
+                "rejected_total": dict(self._rejected),
+                "limits": {
+                    "per_ip": self.per_ip,
+                    "per_user": self.per_user,
+                    "per_channel": self.per_channel,
+                    "total": self.total,
+                },
+                "channels": dict(self._by_channel),
+                "unique_ips": len(self._by_ip),
+                "unique_users": len(self._by_user),
+                "top_ips": self._by_ip.most_common(top),
+            }
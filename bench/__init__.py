@@ -0,0 +1 @@
+"""In-process benchmark and soak suite; see bench/run.py."""
@@ -0,0 +1,234 @@
+"""Minimal asyncio HTTP clients and delivery statistics for the benchmark suite."""
+
+import asyncio
+import math
+import sys
+import time
+
+# Inter-arrival gap histogram buckets (ms); the last bucket is open-ended
+GAP_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, math.inf)
+
+# Gaps at least this long are audible stalls on a typical player buffer
+STALL_SECONDS = 1.0
+
+
+def client_ip(index: int, spread: bool) -> str | None:
+    """Distinct loopback source address per simulated client (Linux only)."""
+    if not spread:
+        return None
+    return f"127.0.{1 + index // 250}.{2 + index % 250}"
+
+
+def default_spread_ips() -> bool:
+    return sys.platform.startswith("linux")
+
+
+def percentile(values, pct: float):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values, scale: float = 1000.0, digits: int = 1) -> dict:
+    """p50/p95/p99/max of a list of seconds, reported in ms by default."""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50) * scale, digits),
+        "p95": round(percentile(values, 95) * scale, digits),
+        "p99": round(percentile(values, 99) * scale, digits),
+        "max": round(max(values) * scale, digits),
+    }
+
+
+class GapStats:
+    """Streaming stats for read inter-arrival gaps; constant memory for long soaks."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.max = 0.0
+        self.stalls = 0
+        self.buckets = [0] * len(GAP_BUCKETS_MS)
+
+    def add(self, gap: float):
+        self.count += 1
+        self.total += gap
+        self.total_sq += gap * gap
+        self.max = max(self.max, gap)
+        if gap >= STALL_SECONDS:
+            self.stalls += 1
+        gap_ms = gap * 1000
+        for i, bound in enumerate(GAP_BUCKETS_MS):
+            if gap_ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def merge(self, other: "GapStats"):
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.max = max(self.max, other.max)
+        self.stalls += other.stalls
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+    def bucket_percentile(self, pct: float) -> float | None:
+        """Upper bound (ms) of the histogram bucket holding the percentile."""
+        if not self.count:
+            return None
+        target = pct / 100 * self.count
+        seen = 0
+        for bound, n in zip(GAP_BUCKETS_MS, self.buckets):
+            seen += n
+            if seen >= target:
+                return bound if bound != math.inf else round(self.max * 1000, 1)
+        return round(self.max * 1000, 1)
+
+    def to_dict(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        mean = self.total / self.count
+        variance = max(0.0, self.total_sq / self.count - mean * mean)
+        return {
+            "count": self.count,
+            "mean_ms": round(mean * 1000, 2),
+            "jitter_ms": round(math.sqrt(variance) * 1000, 2),
+            "p99_le_ms": self.bucket_percentile(99),
+            "max_ms": round(self.max * 1000, 1),
+            "stalls": self.stalls,
+            "histogram_ms": {
+                ("inf" if b == math.inf else str(b)): n for b, n in zip(GAP_BUCKETS_MS, self.buckets)
+            },
+        }
+
+
+async def http_request(
+    host: str,
+    port: int,
+    path: str,
+    method: str = "GET",
+    body: bytes = b"",
+    headers: dict | None = None,
+    local_ip: str | None = None,
+    timeout: float = 10.0,
+):
+    """Send one request on a fresh connection.
+
+    Returns (status, response_headers, reader, writer); the caller reads the
+    body and closes the writer.
+    """
+    local_addr = (local_ip, 0) if local_ip else None
+    reader, writer = await asyncio.wait_for(
+        asyncio.open_connection(host, port, local_addr=local_addr), timeout
+    )
+    lines = [f"{method} {path} HTTP/1.1", f"Host: {host}:{port}", "Connection: close"]
+    for name, value in (headers or {}).items():
+        lines.append(f"{name}: {value}")
+    if body:
+        lines.append(f"Content-Length: {len(body)}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout)
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    status = int(status_line.split(" ", 2)[1])
+    response_headers = {}
+    for line in header_lines:
+        if ":" in line:
+            name, value = line.split(":", 1)
+            response_headers[name.strip().lower()] = value.strip()
+    return status, response_headers, reader, writer
+
+
+async def fetch(host: str, port: int, path: str, **kwargs) -> tuple[int, bytes, float]:
+    """Complete request; returns (status, body, latency_seconds)."""
+    started = time.perf_counter()
+    status, _, reader, writer = await http_request(host, port, path, **kwargs)
+    try:
+        body = await asyncio.wait_for(reader.read(), kwargs.get("timeout", 10.0))
+    finally:
+        writer.close()
+    return status, body, time.perf_counter() - started
+
+
+class Listener:
+    """One simulated /stream client, optionally reconnecting when the stream ends."""
+
+    def __init__(self, host: str, port: int, channel: str, local_ip: str | None = None, reconnect: bool = False):
+        self.host = host
+        self.port = port
+        self.channel = channel
+        self.local_ip = local_ip
+        self.reconnect = reconnect
+
+        self.bytes = 0
+        self.gaps = GapStats()
+        self.ttfb: list[float] = []
+        self.statuses: dict[int, int] = {}
+        self.errors = 0
+        self.interruptions: list[float] = []  # last byte -> first byte across reconnects
+        self.connected = False
+        self._last_byte_at = None
+        self._stop = asyncio.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    async def _stream_once(self):
+        started = time.perf_counter()
+        status, _, reader, writer = await http_request(
+            self.host, self.port, f"/stream?channel={self.channel}", local_ip=self.local_ip
+        )
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status != 200:
+            await reader.read()
+            writer.close()
+            return False
+
+        self.connected = True
+        first = True
+        try:
+            while not self._stop.is_set():
+                try:
+                    data = await asyncio.wait_for(reader.read(65536), 0.5)
+                except asyncio.TimeoutError:
+                    continue
+                if not data:
+                    break
+                now = time.perf_counter()
+                if first:
+                    self.ttfb.append(now - started)
+                    if self._last_byte_at is not None:
+                        self.interruptions.append(now - self._last_byte_at)
+                    first = False
+                elif self._last_byte_at is not None:
+                    self.gaps.add(now - self._last_byte_at)
+                self._last_byte_at = now
+                self.bytes += len(data)
+        finally:
+            self.connected = False
+            writer.close()
+        return True
+
+    async def run(self):
+        backoff = 0.05
+        while not self._stop.is_set():
+            try:
+                ok = await self._stream_once()
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                self.errors += 1
+                ok = False
+            if not self.reconnect or self._stop.is_set():
+                return
+            if ok:
+                backoff = 0.05
+                continue
+            try:
+                await asyncio.wait_for(self._stop.wait(), backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, 2.0)
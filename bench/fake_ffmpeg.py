@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Simulated ffmpeg/ffprobe for the benchmark suite.
+
+Invoked through small shell shims as `fake_ffmpeg.py ffmpeg ARGS...` or
+`fake_ffmpeg.py ffprobe ARGS...`. Track "files" are JSON descriptors written
+by bench.harness:
+
+    {"duration": 30.0, "codec": "mp3", "sample_rate": 44100, "bit_rate": 128000}
+
+ffmpeg writes MP3-sized frames to stdout in real time (like `-re`), honouring
+`-ss` and `-c:a copy`. Transcoding burns FAKE_FFMPEG_ENCODE_LOAD of a core
+(default 0.03) to stand in for libmp3lame. With `-progress pipe:2` it reports
+out_time/speed on stderr about twice a second, and FAKE_FFMPEG_FAILURE_RATE
+(default 0) is the chance a run dies mid-track with a non-zero exit, logging a
+network error or, with FAKE_FFMPEG_FAILURE_KIND=track, a decoder error.
+`-f null` analysis runs print an ebur128-style summary instead.
+"""
+import json
+import os
+import random
+import sys
+import time
+
+FRAME_SECONDS = 1152 / 44100  # one MPEG-1 Layer III frame
+FRAME_HEADER = b"\xff\xfb\x90\x64"
+
+
+def _arg(args: list[str], flag: str, default=None):
+    try:
+        return args[args.index(flag) + 1]
+    except (ValueError, IndexError):
+        return default
+
+
+def _load_descriptor(path: str) -> dict | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ffprobe(args: list[str]) -> int:
+    info = _load_descriptor(args[-1])
+    if info is None:
+        print(f"{args[-1]}: No such file or directory", file=sys.stderr)
+        return 1
+    stream = {
+        "codec_name": info.get("codec", "mp3"),
+        "sample_rate": str(info.get("sample_rate", 44100)),
+        "channels": info.get("channels", 2),
+        "bit_rate": str(info.get("bit_rate", 128000)),
+    }
+    fmt = {"duration": str(info.get("duration", 30.0))}
+    print(json.dumps({"streams": [stream], "format": fmt}))
+    return 0
+
+
+def _burn(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _report_progress(out_time: float, speed: float, state: str):
+    sys.stderr.write(f"out_time_us={int(out_time * 1_000_000)}\nspeed={speed:.2f}x\nprogress={state}\n")
+    sys.stderr.flush()
+
+
+def ffmpeg(args: list[str]) -> int:
+    info = _load_descriptor(_arg(args, "-i", ""))
+    if info is None:
+        print("Input file not found", file=sys.stderr)
+        return 1
+
+    if _arg(args, "-f") == "null":
+        minutes, seconds = divmod(float(info.get("duration", 30.0)), 60)
+        print(f"  Duration: 00:{int(minutes):02d}:{seconds:05.2f}, start: 0.000000, bitrate: 128 kb/s", file=sys.stderr)
+        print(f"[Parsed_ebur128_0] Summary:\n\n  Integrated loudness:\n    I:         {info.get('lufs', -18.0):.1f} LUFS", file=sys.stderr)
+        return 0
+
+    passthrough = _arg(args, "-c:a") == "copy"
+    if passthrough:
+        bit_rate = int(info.get("bit_rate", 128000))
+    else:
+        bit_rate = int(_arg(args, "-b:a", "128k").rstrip("k")) * 1000
+    encode_load = 0.0 if passthrough else float(os.getenv("FAKE_FFMPEG_ENCODE_LOAD", "0.03"))
+
+    remaining = float(info.get("duration", 30.0)) - float(_arg(args, "-ss", "0") or 0)
+    frame = FRAME_HEADER + b"\x00" * (int(bit_rate * FRAME_SECONDS / 8) - len(FRAME_HEADER))
+    frames = max(0, int(remaining / FRAME_SECONDS))
+    progress = _arg(args, "-progress") == "pipe:2"
+    fail_at = None
+    if random.random() < float(os.getenv("FAKE_FFMPEG_FAILURE_RATE", "0")):
+        fail_at = random.randrange(frames) if frames else 0
+
+    out = sys.stdout.buffer
+    started = time.monotonic()
+    reported = started
+    try:
+        for i in range(frames):
+            if i == fail_at:
+                if os.getenv("FAKE_FFMPEG_FAILURE_KIND") == "track":
+                    print("Invalid data found when processing input", file=sys.stderr)
+                else:
+                    print("Error in the pull function.", file=sys.stderr)
+                return 1
+            if encode_load:
+                _burn(FRAME_SECONDS * encode_load)
+            out.write(frame)
+            out.flush()
+            now = time.monotonic()
+            if progress and now - reported >= 0.5:
+                elapsed = now - started
+                speed = (i + 1) * FRAME_SECONDS / elapsed if elapsed else 0.0
+                _report_progress((i + 1) * FRAME_SECONDS, speed, "continue")
+                reported = now
+            delay = started + (i + 1) * FRAME_SECONDS - now
+            if delay > 0:
+                time.sleep(delay)
+        if progress:
+            _report_progress(frames * FRAME_SECONDS, 1.0, "end")
+    except (BrokenPipeError, KeyboardInterrupt):
+        # Reader went away (track skipped or streamer stopped); skip the
+        # interpreter's final flush of the dead pipe.
+        os._exit(0)
+    return 0
+
+
+def main() -> int:
+    if len(sys.argv) < 2:
+        print("usage: fake_ffmpeg.py ffmpeg|ffprobe ARGS...", file=sys.stderr)
+        return 2
+    tool, args = sys.argv[1], sys.argv[2:]
+    return ffprobe(args) if tool == "ffprobe" else ffmpeg(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
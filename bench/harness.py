@@ -0,0 +1,277 @@
+"""In-process benchmark harness.
+
+Builds a synthetic catalog on local disk, points the app at it (no CloudFront,
+no Postgres), optionally swaps ffmpeg for bench/fake_ffmpeg.py, and runs the
+FastAPI app under uvicorn on a background thread.
+
+prepare_environment() must run before anything imports config.
+"""
+import os
+import random
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+FAKE_FFMPEG = os.path.join(BENCH_DIR, "fake_ffmpeg.py")
+
+_CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def _write_fake_tools(bin_dir: str):
+    os.makedirs(bin_dir, exist_ok=True)
+    for tool in ("ffmpeg", "ffprobe"):
+        path = os.path.join(bin_dir, tool)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_FFMPEG}" {tool} "$@"\n')
+        os.chmod(path, 0o755)
+
+
+def _write_track(path: str, duration: float, sample_rate: int, real_ffmpeg: bool):
+    if not real_ffmpeg:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(
+                '{"duration": %.1f, "codec": "mp3", "sample_rate": %d, "bit_rate": 128000, "lufs": %.1f}'
+                % (duration, sample_rate, random.uniform(-24, -10))
+            )
+        return
+    subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+            "-f", "lavfi",
+            "-i", f"sine=frequency={random.randint(220, 880)}:sample_rate={sample_rate}:duration={duration}",
+            "-ac", "2", "-b:a", "128k", path,
+        ],
+        check=True,
+    )
+
+
+def prepare_environment(
+    workdir: str,
+    tracks: int = 24,
+    playlists: int = 4,
+    track_seconds: float = 30.0,
+    real_ffmpeg: bool = False,
+    transcode_ratio: float = 0.25,
+) -> dict:
+    """Write a synthetic catalog under workdir and configure the app to use it.
+
+    A `transcode_ratio` share of tracks are 48 kHz so they cannot be passed through.
+    """
+    random.seed(1234)
+    music_dir = os.path.join(workdir, "music")
+    os.makedirs(music_dir, exist_ok=True)
+
+    if not real_ffmpeg:
+        bin_dir = os.path.join(workdir, "bin")
+        _write_fake_tools(bin_dir)
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+    elif not shutil.which("ffmpeg"):
+        raise RuntimeError("--real-ffmpeg needs ffmpeg in PATH")
+
+    track_keys = []
+    with open(os.path.join(workdir, "tracks.csv"), "w", encoding="utf-8") as f:
+        f.write("Track Name,File Name,KEY TITLE\n")
+        for i in range(tracks):
+            key = f"BENCH_TRACK_{i:03d}"
+            filename = f"bench_track_{i:03d}.mp3"
+            sample_rate = 48000 if i < tracks * transcode_ratio else 44100
+            _write_track(os.path.join(music_dir, filename), track_seconds, sample_rate, real_ffmpeg)
+            f.write(f"Bench Track {i},{filename},{key}\n")
+            track_keys.append(key)
+
+    playlist_names = [f"bench_playlist_{p}" for p in range(playlists)]
+    with open(os.path.join(workdir, "playlists.csv"), "w", encoding="utf-8") as f:
+        f.write("Playlist Title,Track Key\n")
+        for i, key in enumerate(track_keys):
+            f.write(f"{playlist_names[i % playlists]},{key}\n")
+
+    os.environ.update(
+        {
+            "TRACK_SOURCE": "local",
+            "MUSIC_BASE_DIR": music_dir,
+            "TRACKS_CSV_PATH": os.path.join(workdir, "tracks.csv"),
+            "PLAYLISTS_CSV_PATH": os.path.join(workdir, "playlists.csv"),
+            "LOUDNESS_CACHE_PATH": os.path.join(workdir, "loudness.json"),
+            "RESTART_STATE_PATH": os.path.join(workdir, "radio_state.json"),
+            "SILENCE_PATH": os.path.join(REPO_DIR, "silence.mp3"),
+            "LOUDNESS_ENABLED": "false",
+            "DEV_MODE": "true",
+            "DEV_USER_EMAIL": "bench@localhost",
+            "ADMIN_EMAILS": "bench@localhost",
+            "SESSION_SECRET": "bench-secret",
+            "PG_DB": "bench",
+            "PG_USER": "bench",
+            "PG_PW": "bench",
+            "PG_HOST": "127.0.0.1",
+        }
+    )
+    return {"music_dir": music_dir, "playlists": playlist_names, "tracks": track_keys}
+
+
+def install_session_stub():
+    """Resolve any validly signed cookie to a user without touching Postgres."""
+    import sessions
+
+    sessions._fetch_session = lambda session_id: {"user": session_id}
+
+
+def quiet_app_logging(verbose: bool = False):
+    import logging
+
+    level = logging.INFO if verbose else logging.WARNING
+    for name in ("radio", "httpx", "uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).setLevel(level)
+
+
+def make_service(rate_limits: bool = False):
+    """A RadioWebService with the catalog loaded and slowapi optionally disabled."""
+    import radio
+    from tracks import reload_tracks
+    from playlists import reload_playlists
+
+    reload_tracks()
+    reload_playlists()
+    # Every bench client comes from loopback; per-IP rate limits would cap
+    # the load at a handful of requests per minute.
+    radio.limiter.enabled = rate_limits
+    return radio.RadioWebService()
+
+
+class BenchServer:
+    """Run a RadioWebService under uvicorn on a background thread."""
+
+    def __init__(self, service, sock: socket.socket | None = None, host: str = "127.0.0.1"):
+        import uvicorn
+        import radio
+
+        self.service = service
+        self.sock = sock or socket.create_server((host, 0))
+        self.host, self.port = self.sock.getsockname()[:2]
+        config = uvicorn.Config(
+            service.app,
+            log_level="warning",
+            timeout_graceful_shutdown=5,
+            lifespan="on",
+        )
+        self.server = radio.RadioServer(config, service)
+        self.thread = threading.Thread(target=self.server.run, kwargs={"sockets": [self.sock]}, daemon=True)
+
+    def start(self, timeout: float = 10.0):
+        self.thread.start()
+        deadline = time.time() + timeout
+        while not self.server.started:
+            if time.time() > deadline or not self.thread.is_alive():
+                raise RuntimeError("uvicorn failed to start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self, timeout: float = 15.0):
+        """Graceful stop, as if the process received SIGTERM."""
+        import signal
+
+        self.server.handle_exit(signal.SIGTERM, None)
+        self.thread.join(timeout)
+
+
+def _children_cpu_seconds() -> float:
+    """CPU time of live child processes (ffmpeg), from /proc where available."""
+    if not os.path.isdir("/proc"):
+        return 0.0
+    total = 0
+    pid = str(os.getpid())
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", "r") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # fields[1] is ppid; utime/stime are fields 14/15 of the full line
+        if fields[1] == pid:
+            total += int(fields[11]) + int(fields[12])
+    return total / _CLK_TCK
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is a peak, in KiB on Linux and bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+def resource_snapshot() -> dict:
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    reaped = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "t": time.time(),
+        "cpu_self": own.ru_utime + own.ru_stime,
+        "cpu_children": reaped.ru_utime + reaped.ru_stime + _children_cpu_seconds(),
+        "rss_mb": round(_rss_mb(), 1),
+        "threads": threading.active_count(),
+    }
+
+
+class ResourceSampler:
+    """Sample process CPU/RSS on a thread; summarize() returns totals and a time series."""
+
+    def __init__(self, interval: float = 5.0, extra=None):
+        self.interval = interval
+        self.extra = extra  # optional callable returning more fields per sample
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _sample(self):
+        snap = resource_snapshot()
+        if self.extra:
+            snap.update(self.extra())
+        self.samples.append(snap)
+
+    def _run(self):
+        self._sample()
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self) -> dict:
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return self.summarize()
+
+    def summarize(self) -> dict:
+        first, last = self.samples[0], self.samples[-1]
+        elapsed = max(last["t"] - first["t"], 1e-9)
+        cpu_self = last["cpu_self"] - first["cpu_self"]
+        cpu_children = max(0.0, last["cpu_children"] - first["cpu_children"])
+        series = [
+            {**s, "t": round(s["t"] - first["t"], 1), "cpu_self": round(s["cpu_self"], 2), "cpu_children": round(s["cpu_children"], 2)}
+            for s in self.samples
+        ]
+        return {
+            "elapsed_sec": round(elapsed, 1),
+            "cpu_seconds_server": round(cpu_self, 2),
+            "cpu_seconds_ffmpeg": round(cpu_children, 2),
+            "cpu_pct_server": round(100 * cpu_self / elapsed, 1),
+            "cpu_pct_ffmpeg": round(100 * cpu_children / elapsed, 1),
+            "rss_mb_start": first["rss_mb"],
+            "rss_mb_end": last["rss_mb"],
+            "rss_mb_peak": max(s["rss_mb"] for s in self.samples),
+            "series": series,
+        }
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Benchmark and soak runner.
+
+Runs the app in-process against a synthetic local catalog (no CloudFront, no
+Postgres) and prints one JSON document with the results.
+
+Usage:
+    python -m bench.run soak --channels 4 --listeners 25 --duration 3600
+    python -m bench.run capacity --channels 4 --step 50
+    python -m bench.run commands --command-rate 5
+    python -m bench.run reload --reload-rate 1
+    python -m bench.run abuse --listeners 20 --abusers 8
+    python -m bench.run restart --listeners 10
+    python -m bench.run restart_process --listeners 10
+    python -m bench.run middleware
+    python -m bench.run track_start --sources local
+    python -m bench.run passthrough --real-ffmpeg
+    python -m bench.run hibernate --idle 30
+    python -m bench.run catalog --tracks 2000 --playlists 40
+
+Pass --output FILE to write the JSON to a file as well.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)
+
+from bench.clients import default_spread_ips  # noqa: E402
+from bench.harness import (  # noqa: E402
+    install_session_stub,
+    prepare_environment,
+    quiet_app_logging,
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Music stream server benchmarks")
+    parser.add_argument(
+        "scenario",
+        choices=["soak", "commands", "reload", "capacity", "abuse", "restart", "restart_process", "middleware", "track_start", "passthrough", "hibernate", "catalog"],
+    )
+    parser.add_argument("--output", help="Also write the JSON result to this file")
+    parser.add_argument("--workdir", help="Catalog directory (default: a temp dir)")
+    parser.add_argument("--real-ffmpeg", action="store_true", help="Use the real ffmpeg instead of the simulator")
+    parser.add_argument("--tracks", type=int, default=24)
+    parser.add_argument("--playlists", type=int, default=4)
+    parser.add_argument("--track-seconds", type=float, default=30.0)
+    parser.add_argument("--transcode-ratio", type=float, default=0.25, help="Share of tracks that need transcoding")
+    parser.add_argument("--no-spread-ips", dest="spread_ips", action="store_false", default=default_spread_ips(),
+                        help="Connect every client from 127.0.0.1")
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's INFO logging")
+
+    load = parser.add_argument_group("load")
+    load.add_argument("--channels", type=int, default=2)
+    load.add_argument("--listeners", type=int, default=10, help="Listeners per channel")
+    load.add_argument("--duration", type=float, default=30.0, help="Seconds (hours for a soak: 3600 * N)")
+    load.add_argument("--ramp", type=float, default=2.0, help="Seconds over which listeners connect")
+    load.add_argument("--sample-interval", type=float, default=5.0, help="Seconds between CPU/RSS samples")
+    load.add_argument("--command-rate", type=float, default=None, help="Host commands per second")
+    load.add_argument("--reload-rate", type=float, default=None, help="Registry reloads per second")
+
+    cap = parser.add_argument_group("capacity")
+    cap.add_argument("--step", type=int, default=25, help="Listeners added per step")
+    cap.add_argument("--step-seconds", type=float, default=10.0)
+    cap.add_argument("--max-listeners", type=int, default=1000)
+    cap.add_argument("--healthy-threshold", type=float, default=99.0, help="Min %% of healthy listeners")
+
+    abuse = parser.add_argument_group("abuse")
+    abuse.add_argument("--abusers", type=int, default=8, help="Concurrent reconnect loops from one IP")
+
+    restart = parser.add_argument_group("restart / hibernate")
+    restart.add_argument("--warmup", type=float, default=3.0)
+    restart.add_argument("--settle", type=float, default=3.0)
+    restart.add_argument("--idle", type=float, default=10.0, help="Seconds with no listeners (hibernate)")
+
+    mw = parser.add_argument_group("middleware")
+    mw.add_argument("--requests", type=int, default=500)
+    mw.add_argument("--concurrency", type=int, default=10)
+    mw.add_argument("--firehose-mb", type=int, default=64)
+    mw.add_argument("--repeat", type=int, default=3)
+
+    other = parser.add_argument_group("track_start / passthrough / catalog")
+    other.add_argument("--sources", nargs="+", default=["local"], help="Track sources to compare")
+    other.add_argument("--samples", type=int, default=10)
+    other.add_argument("--streamers", type=int, default=4)
+    other.add_argument("--skips", type=int, default=4)
+    return parser
+
+
+def apply_scenario_defaults(args):
+    if args.command_rate is None:
+        args.command_rate = 5.0 if args.scenario == "commands" else 0.0
+    if args.reload_rate is None:
+        args.reload_rate = 1.0 if args.scenario == "reload" else 0.0
+
+
+def main():
+    args = build_parser().parse_args()
+    apply_scenario_defaults(args)
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix="radio-bench-")
+    catalog = prepare_environment(
+        workdir,
+        tracks=args.tracks,
+        playlists=args.playlists,
+        track_seconds=args.track_seconds,
+        real_ffmpeg=args.real_ffmpeg,
+        transcode_ratio=args.transcode_ratio,
+    )
+
+    # Only now is it safe to import the app (config reads the environment)
+    from bench.scenarios import SCENARIOS
+
+    import radio  # noqa: F401  (configures logging)
+
+    quiet_app_logging(args.verbose)
+    install_session_stub()
+
+    started = time.time()
+    results = asyncio.run(SCENARIOS[args.scenario](args, catalog))
+    report = {
+        "scenario": args.scenario,
+        "started_at": started,
+        "elapsed_sec": round(time.time() - started, 1),
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "workdir")},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "ffmpeg": "real" if args.real_ffmpeg else "simulated",
+            "workdir": workdir,
+        },
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
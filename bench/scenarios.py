@@ -0,0 +1,846 @@
+"""Benchmark scenarios. Each takes (args, catalog) and returns a JSON-able dict."""
+
+import asyncio
+import json
+import random
+import time
+
+from bench.clients import (
+    GapStats,
+    Listener,
+    client_ip,
+    fetch,
+    http_request,
+    summarize,
+)
+from bench.harness import BenchServer, ResourceSampler, make_service, resource_snapshot
+
+# A listener is healthy if it received this share of the expected bytes and never stalled
+HEALTHY_DELIVERY_RATIO = 0.9
+
+
+def _expected_bytes_per_sec() -> float:
+    from config import OUTPUT_BITRATE_KBPS
+
+    return OUTPUT_BITRATE_KBPS * 1000 / 8
+
+
+def _unlimited_admission(service):
+    # Scenarios other than "abuse" measure the pipeline, not the quotas
+    service.admission.per_ip = 0
+    service.admission.per_user = 0
+    service.admission.per_channel = 0
+    service.admission.total = 0
+
+
+def _dropped_chunks(service) -> int:
+    return sum(s.dropped_chunks for s in list(service.streamers.values()))
+
+
+def _active_listeners(service) -> int:
+    return service.admission.stats()["active"]
+
+
+async def _post_json(server: BenchServer, path: str, payload: dict) -> int:
+    status, _, _ = await fetch(
+        server.host,
+        server.port,
+        path,
+        method="POST",
+        body=json.dumps(payload).encode(),
+        headers={"Content-Type": "application/json"},
+    )
+    return status
+
+
+async def _start_channels(server: BenchServer, channels: int, playlists: list[str]) -> list[str]:
+    names = []
+    for c in range(channels):
+        name = f"bench{c}"
+        await _post_json(server, "/command", {"channel": name, "playlist": playlists[c % len(playlists)]})
+        names.append(name)
+    return names
+
+
+def _listener_report(listeners: list[Listener], window: float) -> dict:
+    rate = _expected_bytes_per_sec()
+    gaps = GapStats()
+    ttfb = []
+    healthy = 0
+    ratios = []
+    statuses: dict[int, int] = {}
+    for listener in listeners:
+        gaps.merge(listener.gaps)
+        ttfb.extend(listener.ttfb)
+        for status, n in listener.statuses.items():
+            statuses[status] = statuses.get(status, 0) + n
+        if not listener.ttfb:
+            ratios.append(0.0)
+            continue
+        ratio = listener.bytes / (rate * max(window - listener.ttfb[0], 1e-9))
+        ratios.append(ratio)
+        if ratio >= HEALTHY_DELIVERY_RATIO and listener.gaps.stalls == 0:
+            healthy += 1
+    return {
+        "listeners": len(listeners),
+        "healthy": healthy,
+        "healthy_pct": round(100 * healthy / len(listeners), 1) if listeners else 0.0,
+        "delivery_ratio_min": round(min(ratios), 3) if ratios else None,
+        "delivery_ratio_mean": round(sum(ratios) / len(ratios), 3) if ratios else None,
+        "bytes_total": sum(listener.bytes for listener in listeners),
+        "errors": sum(listener.errors for listener in listeners),
+        "statuses": statuses,
+        "ttfb_ms": summarize(ttfb),
+        "chunk_gaps": gaps.to_dict(),
+    }
+
+
+async def _storm(interval: float, action, stop: asyncio.Event, counters: dict, key: str):
+    """Run `action` every `interval` seconds until stopped, counting statuses."""
+    while not stop.is_set():
+        try:
+            status = await action()
+            counters[key][status] = counters[key].get(status, 0) + 1
+        except Exception:
+            counters[key]["error"] = counters[key].get("error", 0) + 1
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def soak(args, catalog) -> dict:
+    """N channels x M listeners for --duration, with optional command and reload storms."""
+    service = make_service()
+    _unlimited_admission(service)
+    server = BenchServer(service).start()
+    sampler = ResourceSampler(
+        args.sample_interval,
+        extra=lambda: {"listeners": _active_listeners(service), "dropped_chunks": _dropped_chunks(service)},
+    ).start()
+
+    channels = await _start_channels(server, args.channels, catalog["playlists"])
+    listeners = [
+        Listener(server.host, server.port, channels[i % len(channels)], client_ip(i, args.spread_ips))
+        for i in range(args.channels * args.listeners)
+    ]
+
+    started = time.perf_counter()
+    tasks = []
+    for listener in listeners:
+        tasks.append(asyncio.create_task(listener.run()))
+        await asyncio.sleep(args.ramp / max(len(listeners), 1))
+
+    stop = asyncio.Event()
+    storm_counts = {"commands": {}, "reloads": {}}
+    storms = []
+    if args.command_rate > 0:
+        async def command():
+            channel = random.choice(channels)
+            if random.random() < 0.5:
+                return await _post_json(server, "/command", {"channel": channel, "command": "next"})
+            playlist = random.choice(catalog["playlists"])
+            return await _post_json(server, "/command", {"channel": channel, "playlist": playlist})
+
+        storms.append(asyncio.create_task(_storm(1 / args.command_rate, command, stop, storm_counts, "commands")))
+    if args.reload_rate > 0:
+        storms.append(
+            asyncio.create_task(
+                _storm(1 / args.reload_rate, lambda: _post_json(server, "/admin/reload", {}), stop, storm_counts, "reloads")
+            )
+        )
+
+    await asyncio.sleep(max(0.0, args.duration - (time.perf_counter() - started)))
+    window = time.perf_counter() - started
+
+    stop.set()
+    for listener in listeners:
+        listener.stop()
+    await asyncio.gather(*tasks, *storms)
+
+    dropped = _dropped_chunks(service)
+    server.stop()
+    resources = sampler.stop()
+
+    return {
+        "channels": args.channels,
+        "listeners_per_channel": args.listeners,
+        "duration_sec": round(window, 1),
+        "delivery": _listener_report(listeners, window),
+        "dropped_chunks_server": dropped,
+        "storms": storm_counts,
+        "resources": resources,
+    }
+
+
+async def capacity(args, catalog) -> dict:
+    """Add listeners in steps until delivery degrades; report the last healthy level."""
+    service = make_service()
+    _unlimited_admission(service)
+    server = BenchServer(service).start()
+    channels = await _start_channels(server, args.channels, catalog["playlists"])
+    rate = _expected_bytes_per_sec()
+
+    listeners: list[Listener] = []
+    tasks = []
+    steps = []
+    capacity_listeners = 0
+    while len(listeners) < args.max_listeners:
+        for _ in range(args.step):
+            i = len(listeners)
+            listener = Listener(server.host, server.port, channels[i % len(channels)], client_ip(i, args.spread_ips))
+            listeners.append(listener)
+            tasks.append(asyncio.create_task(listener.run()))
+
+        # Let the new listeners settle before measuring the window
+        await asyncio.sleep(min(2.0, args.step_seconds / 4))
+        before_bytes = [listener.bytes for listener in listeners]
+        before_stalls = [listener.gaps.stalls for listener in listeners]
+        before_snap = resource_snapshot()
+        probe_latencies = []
+        window_started = time.perf_counter()
+        while time.perf_counter() - window_started < args.step_seconds:
+            try:
+                _, _, latency = await fetch(server.host, server.port, "/robots.txt")
+                probe_latencies.append(latency)
+            except (OSError, asyncio.TimeoutError):
+                probe_latencies.append(10.0)
+            await asyncio.sleep(0.25)
+        window = time.perf_counter() - window_started
+        after_snap = resource_snapshot()
+
+        healthy = sum(
+            1
+            for listener, b, s in zip(listeners, before_bytes, before_stalls)
+            if (listener.bytes - b) >= HEALTHY_DELIVERY_RATIO * rate * window and listener.gaps.stalls == s
+        )
+        healthy_pct = 100 * healthy / len(listeners)
+        steps.append(
+            {
+                "listeners": len(listeners),
+                "healthy": healthy,
+                "healthy_pct": round(healthy_pct, 1),
+                "probe_latency_ms": summarize(probe_latencies),
+                "cpu_pct_server": round(100 * (after_snap["cpu_self"] - before_snap["cpu_self"]) / window, 1),
+                "rss_mb": after_snap["rss_mb"],
+                "dropped_chunks_server": _dropped_chunks(service),
+            }
+        )
+        if healthy_pct < args.healthy_threshold:
+            break
+        capacity_listeners = len(listeners)
+
+    for listener in listeners:
+        listener.stop()
+    await asyncio.gather(*tasks)
+    server.stop()
+    return {
+        "channels": args.channels,
+        "healthy_threshold_pct": args.healthy_threshold,
+        "capacity_listeners": capacity_listeners,
+        "steps": steps,
+    }
+
+
+async def abuse(args, catalog) -> dict:
+    """Normal listeners plus one client hammering /stream from a single IP."""
+    # The only scenario that exercises the per-IP rate limits as deployed
+    service = make_service(rate_limits=True)
+    server = BenchServer(service).start()
+    channels = await _start_channels(server, 1, catalog["playlists"])
+    channel = channels[0]
+
+    listeners = [
+        Listener(server.host, server.port, channel, client_ip(i, args.spread_ips))
+        for i in range(args.listeners)
+    ]
+    listeners_started = time.perf_counter()
+    tasks = [asyncio.create_task(listener.run()) for listener in listeners]
+    await asyncio.sleep(1.0)
+
+    abuser_ip = client_ip(args.listeners + 1, args.spread_ips)
+    stop = asyncio.Event()
+    attempts: dict = {}
+    retry_after = set()
+
+    async def hammer():
+        # Ignores Retry-After and reconnects as fast as it can
+        while not stop.is_set():
+            try:
+                status, headers, reader, writer = await http_request(
+                    server.host, server.port, f"/stream?channel={channel}", local_ip=abuser_ip
+                )
+                attempts[status] = attempts.get(status, 0) + 1
+                if "retry-after" in headers:
+                    retry_after.add(headers["retry-after"])
+                if status == 200:
+                    await asyncio.wait_for(reader.read(4096), 5)
+                writer.close()
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                attempts["error"] = attempts.get("error", 0) + 1
+                await asyncio.sleep(0.01)
+
+    probe_latencies = []
+
+    async def probe():
+        while not stop.is_set():
+            try:
+                _, _, latency = await fetch(server.host, server.port, "/robots.txt")
+                probe_latencies.append(latency)
+            except (OSError, asyncio.TimeoutError):
+                probe_latencies.append(10.0)
+            await asyncio.sleep(0.1)
+
+    sampler = ResourceSampler(args.sample_interval).start()
+    started = time.perf_counter()
+    abusers = [asyncio.create_task(hammer()) for _ in range(args.abusers)]
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(args.duration)
+    window = time.perf_counter() - started
+    stop.set()
+    await asyncio.gather(*abusers, prober)
+    resources = sampler.stop()
+
+    # Slots held by the abusive client must drain back once it stops
+    await asyncio.sleep(2.0)
+    admission_after = service.admission.stats()
+
+    for listener in listeners:
+        listener.stop()
+    await asyncio.gather(*tasks)
+    # Normal listeners outlive the abuse window (warm-up and drain check), so
+    # judge their delivery over their own lifetime
+    listener_lifetime = time.perf_counter() - listeners_started
+    server.stop()
+
+    resources.pop("series", None)
+    return {
+        "listeners": args.listeners,
+        "abusive_connections": args.abusers,
+        "duration_sec": round(window, 1),
+        "abusive_attempts": attempts,
+        "abusive_attempts_per_sec": round(sum(attempts.values()) / window, 1),
+        "retry_after_values": sorted(retry_after),
+        "normal_delivery": _listener_report(listeners, listener_lifetime),
+        "probe_latency_ms": summarize(probe_latencies),
+        "admission_after_abuse": {
+            "active": admission_after["active"],
+            "expected_active": args.listeners,
+            "rejected_total": admission_after["rejected_total"],
+        },
+        "resources": resources,
+    }
+
+
+async def restart(args, catalog) -> dict:
+    """Hot-restart handoff on a shared socket while listeners stay connected."""
+    import socket
+
+    sock = socket.create_server(("127.0.0.1", 0))
+    old_service = make_service()
+    _unlimited_admission(old_service)
+    old = BenchServer(old_service, sock=sock).start()
+    channels = await _start_channels(old, args.channels, catalog["playlists"])
+
+    listeners = [
+        Listener(old.host, old.port, channels[i % len(channels)], client_ip(i, args.spread_ips), reconnect=True)
+        for i in range(args.channels * args.listeners)
+    ]
+    tasks = [asyncio.create_task(listener.run()) for listener in listeners]
+    await asyncio.sleep(args.warmup)
+    positions_before = {s.playlist_name: s.position() for s in old_service.streamers.values()}
+
+    # Same steps as SIGUSR2: export state, start the replacement on a copy of
+    # the listening socket, then drain the old server.
+    handoff_started = time.perf_counter()
+    state = old_service.export_state()
+    new_service = make_service()
+    _unlimited_admission(new_service)
+    new_service.restore_state(state)
+    new = BenchServer(new_service, sock=sock.dup()).start()
+    new_ready = time.perf_counter() - handoff_started
+    await asyncio.get_running_loop().run_in_executor(None, old.stop)
+    old_stopped = time.perf_counter() - handoff_started
+
+    await asyncio.sleep(args.settle)
+    reconnected = sum(1 for listener in listeners if listener.connected)
+    resumed = {
+        s.playlist_name: {
+            "track_before": positions_before.get(s.playlist_name, {}).get("index"),
+            "track_after": s.track_index,
+            "same_order": positions_before.get(s.playlist_name, {}).get("order") == s.track_order,
+        }
+        for s in new_service.streamers.values()
+    }
+
+    for listener in listeners:
+        listener.stop()
+    await asyncio.gather(*tasks)
+    new.stop()
+    sock.close()
+
+    interruptions = [gap for listener in listeners for gap in listener.interruptions]
+    return {
+        "channels": args.channels,
+        "listeners": len(listeners),
+        "replacement_ready_ms": round(new_ready * 1000, 1),
+        "old_server_drained_ms": round(old_stopped * 1000, 1),
+        "reconnected": reconnected,
+        "interruption_ms": summarize(interruptions),
+        "listeners_without_interruption_sample": sum(1 for listener in listeners if not listener.interruptions),
+        "resumed_streamers": resumed,
+    }
+
+
+def _recv_notify(notify, timeout: float) -> dict:
+    """Next sd_notify datagram as a dict, or {} on timeout."""
+    import socket
+
+    notify.settimeout(timeout)
+    try:
+        data = notify.recv(4096)
+    except socket.timeout:
+        return {}
+    return dict(line.split("=", 1) for line in data.decode().splitlines() if "=" in line)
+
+
+def _pid_alive(pid: int) -> bool:
+    """True while the process runs; a zombie (exited, not yet reaped) counts as gone."""
+    try:
+        with open(f"/proc/{pid}/stat", "r") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except OSError:
+        return False
+
+
+async def restart_process(args, catalog) -> dict:
+    """SIGUSR2 against a real `python radio.py` process while listeners stay connected.
+
+    The server runs as a subprocess with a NOTIFY_SOCKET, as under a systemd
+    Type=notify unit, so the handoff is observed the way systemd sees it: the
+    replacement reports its MAINPID and the original process exits. A second
+    SIGUSR2 follows the first to check that it doesn't start another replacement.
+    """
+    import os
+    import shutil
+    import signal
+    import socket
+    import subprocess
+    import sys
+    import tempfile
+    import types
+
+    from bench.harness import REPO_DIR
+
+    with socket.create_server(("127.0.0.1", 0)) as probe:
+        port = probe.getsockname()[1]
+    notify_dir = tempfile.mkdtemp(prefix="radio-notify-")
+    notify = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    notify.bind(os.path.join(notify_dir, "notify.sock"))
+    env = dict(
+        os.environ,
+        HOST="127.0.0.1",
+        PORT=str(port),
+        NOTIFY_SOCKET=notify.getsockname(),
+        MAX_LISTENERS_PER_IP="0",
+        MAX_LISTENERS_PER_USER="0",
+        MAX_LISTENERS_PER_CHANNEL="0",
+        MAX_LISTENERS_TOTAL="0",
+    )
+    output = None if args.verbose else subprocess.DEVNULL
+    loop = asyncio.get_running_loop()
+
+    launched = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "radio.py"], cwd=REPO_DIR, env=env, stdout=output, stderr=output
+    )
+    pids = {proc.pid}
+    try:
+        ready = await loop.run_in_executor(None, _recv_notify, notify, 30.0)
+        if ready.get("READY") != "1":
+            raise RuntimeError("radio.py did not report READY")
+        startup = time.perf_counter() - launched
+
+        server = types.SimpleNamespace(host="127.0.0.1", port=port)
+        channels = await _start_channels(server, args.channels, catalog["playlists"])
+        listeners = [
+            Listener(server.host, port, channels[i % len(channels)], client_ip(i, args.spread_ips), reconnect=True)
+            for i in range(args.channels * args.listeners)
+        ]
+        tasks = [asyncio.create_task(listener.run()) for listener in listeners]
+        await asyncio.sleep(args.warmup)
+
+        handoff_started = time.perf_counter()
+        os.kill(proc.pid, signal.SIGUSR2)
+        await asyncio.sleep(0.1)
+        os.kill(proc.pid, signal.SIGUSR2)
+
+        new_pid = None
+        new_ready = None
+        old_exit = None
+        old_drained = None
+        replacements = set()
+        deadline = time.perf_counter() + 30.0 + args.settle
+        while time.perf_counter() < deadline:
+            message = await loop.run_in_executor(None, _recv_notify, notify, 0.2)
+            if "MAINPID" in message:
+                replacements.add(int(message["MAINPID"]))
+                pids.add(int(message["MAINPID"]))
+                if new_pid is None:
+                    new_pid = int(message["MAINPID"])
+                    new_ready = time.perf_counter() - handoff_started
+            if old_exit is None and proc.poll() is not None:
+                old_exit = proc.returncode
+                old_drained = time.perf_counter() - handoff_started
+            if old_exit is not None and time.perf_counter() - handoff_started > old_drained + args.settle:
+                break
+
+        reconnected = sum(1 for listener in listeners if listener.connected)
+        for listener in listeners:
+            listener.stop()
+        await asyncio.gather(*tasks)
+    finally:
+        for pid in pids:
+            if _pid_alive(pid):
+                os.kill(pid, signal.SIGTERM)
+        stop_deadline = time.time() + 15
+        while time.time() < stop_deadline and (proc.poll() is None or any(_pid_alive(pid) for pid in pids)):
+            await asyncio.sleep(0.1)
+        notify.close()
+        shutil.rmtree(notify_dir, ignore_errors=True)
+
+    interruptions = [gap for listener in listeners for gap in listener.interruptions]
+    return {
+        "channels": args.channels,
+        "listeners": len(listeners),
+        "startup_ms": round(startup * 1000, 1),
+        "replacement_ready_ms": round(new_ready * 1000, 1) if new_ready is not None else None,
+        "old_process_exit_ms": round(old_drained * 1000, 1) if old_drained is not None else None,
+        "old_process_exit_code": old_exit,
+        "replacements_started": len(replacements),
+        "reconnected": reconnected,
+        "interruption_ms": summarize(interruptions),
+        "listeners_without_interruption_sample": sum(1 for listener in listeners if not listener.interruptions),
+    }
+
+
+async def middleware(args, catalog) -> dict:
+    """Static latency and streaming throughput with no auth layer, the ASGI layer, and BaseHTTPMiddleware."""
+    from fastapi.responses import StreamingResponse
+    from starlette.middleware import Middleware
+    from starlette.middleware.base import BaseHTTPMiddleware
+    from sessions import LazySession, SessionMiddleware
+
+    async def legacy_dispatch(request, call_next):
+        # What the old middleware did: resolve the session on every request
+        request.state.session_data = await LazySession(request.scope).load()
+        return await call_next(request)
+
+    chunk = b"\x00" * 1024
+    total_chunks = args.firehose_mb * 1024
+
+    def firehose():
+        for _ in range(total_chunks):
+            yield chunk
+
+    results = {}
+    for variant in ("none", "asgi", "base_http"):
+        service = make_service()
+        app = service.app
+        app.user_middleware = [m for m in app.user_middleware if m.cls is not SessionMiddleware]
+        if variant == "asgi":
+            app.user_middleware.insert(
+                0,
+                Middleware(
+                    SessionMiddleware,
+                    public_paths=service.PUBLIC_PATHS,
+                    public_prefixes=service.PUBLIC_PREFIXES,
+                ),
+            )
+        elif variant == "base_http":
+            app.user_middleware.insert(0, Middleware(BaseHTTPMiddleware, dispatch=legacy_dispatch))
+        # Not a public path, so the auth layer sees it like any private route
+        app.add_api_route("/bench/firehose", lambda: StreamingResponse(firehose(), media_type="application/octet-stream"))
+        server = BenchServer(service).start()
+
+        sem = asyncio.Semaphore(args.concurrency)
+        latencies = []
+
+        async def one_static():
+            async with sem:
+                _, _, latency = await fetch(server.host, server.port, "/static/style.css")
+                latencies.append(latency)
+
+        await asyncio.gather(*(one_static() for _ in range(args.requests)))
+
+        throughputs = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            status, body, _ = await fetch(server.host, server.port, "/bench/firehose", timeout=120)
+            elapsed = time.perf_counter() - started
+            throughputs.append(len(body) / elapsed / (1024 * 1024))
+
+        server.stop()
+        results[variant] = {
+            "static_latency_ms": summarize(latencies, digits=2),
+            "stream_mb_per_sec": {
+                "best": round(max(throughputs), 1),
+                "mean": round(sum(throughputs) / len(throughputs), 1),
+            },
+        }
+    return {"requests": args.requests, "concurrency": args.concurrency, "firehose_mb": args.firehose_mb, "variants": results}
+
+
+async def track_start(args, catalog) -> dict:
+    """Time from streamer start to first audio chunk, per track source backend."""
+    import queue
+
+    from streamer import AudioStreamer
+    from track_sources import get_track_source
+    from tracks import reload_tracks
+    from playlists import reload_playlists
+
+    reload_tracks()
+    reload_playlists()
+
+    def first_chunk_latency(source_name: str) -> float | None:
+        streamer = AudioStreamer(random.choice(catalog["playlists"]), source=get_track_source(source_name))
+        q = queue.Queue()
+        streamer.add_listener("bench", q)
+        started = time.perf_counter()
+        streamer.start()
+        try:
+            q.get(timeout=30)
+            return time.perf_counter() - started
+        except queue.Empty:
+            return None
+        finally:
+            streamer.stop()
+
+    loop = asyncio.get_running_loop()
+    results = {}
+    for source_name in args.sources:
+        samples = []
+        failures = 0
+        for _ in range(args.samples):
+            latency = await loop.run_in_executor(None, first_chunk_latency, source_name)
+            if latency is None:
+                failures += 1
+            else:
+                samples.append(latency)
+        results[source_name] = {
+            "first_chunk_ms": summarize(samples),
+            "cold_first_ms": round(samples[0] * 1000, 1) if samples else None,
+            "failures": failures,
+        }
+    return {"samples_per_source": args.samples, "sources": results}
+
+
+async def passthrough(args, catalog) -> dict:
+    """ffmpeg CPU with passthrough enabled versus forced transcoding."""
+    import streamer as streamer_module
+    from streamer import AudioStreamer
+    from tracks import reload_tracks
+    from playlists import reload_playlists
+
+    reload_tracks()
+    reload_playlists()
+    loop = asyncio.get_running_loop()
+
+    def run(enabled: bool) -> dict:
+        streamer_module.PASSTHROUGH_ENABLED = enabled
+        sampler = ResourceSampler(args.sample_interval).start()
+        streamers = [AudioStreamer(catalog["playlists"][i % len(catalog["playlists"])]) for i in range(args.streamers)]
+        for s in streamers:
+            # No listeners are attached; without this they would hibernate
+            # before spawning ffmpeg
+            s.keep_warm = True
+            s.start()
+        time.sleep(args.duration)
+        # Skip through a few tracks so the mix reflects the catalog
+        for _ in range(args.skips):
+            for s in streamers:
+                s.put_command("next")
+            time.sleep(args.duration / max(args.skips, 1) / 4)
+        for s in streamers:
+            s.stop()
+        resources = sampler.stop()
+        plays = {"passthrough": 0, "transcode": 0}
+        for s in streamers:
+            for mode, n in s.plays.items():
+                plays[mode] += n
+        total = sum(plays.values())
+        return {
+            "plays": plays,
+            "passthrough_pct": round(100 * plays["passthrough"] / total, 1) if total else 0.0,
+            "cpu_seconds_ffmpeg": resources["cpu_seconds_ffmpeg"],
+            "cpu_seconds_server": resources["cpu_seconds_server"],
+            "elapsed_sec": resources["elapsed_sec"],
+        }
+
+    original = streamer_module.PASSTHROUGH_ENABLED
+    try:
+        enabled = await loop.run_in_executor(None, run, True)
+        disabled = await loop.run_in_executor(None, run, False)
+    finally:
+        streamer_module.PASSTHROUGH_ENABLED = original
+
+    result = {
+        "streamers": args.streamers,
+        "passthrough_enabled": enabled,
+        "transcode_only": disabled,
+    }
+    if not args.real_ffmpeg:
+        # The simulator's CPU cost is made up, so only the play mix means anything
+        result["ffmpeg_cpu_saved_pct"] = None
+        result["note"] = "simulated ffmpeg: CPU figures are not meaningful, rerun with --real-ffmpeg"
+        return result
+    baseline = disabled["cpu_seconds_ffmpeg"]
+    result["ffmpeg_cpu_saved_pct"] = round(100 * (baseline - enabled["cpu_seconds_ffmpeg"]) / baseline, 1) if baseline else None
+    return result
+
+
+async def hibernate(args, catalog) -> dict:
+    """ffmpeg CPU while a channel has no listeners, and wake latency, with and without hibernation."""
+    import streamer as streamer_module
+
+    loop = asyncio.get_running_loop()
+
+    async def run(enabled: bool) -> dict:
+        streamer_module.HIBERNATION_ENABLED = enabled
+        service = make_service()
+        _unlimited_admission(service)
+        server = BenchServer(service).start()
+        channels = await _start_channels(server, args.channels, catalog["playlists"])
+
+        async def listen(seconds: float) -> list[Listener]:
+            listeners = [
+                Listener(server.host, server.port, channels[i % len(channels)], client_ip(i, args.spread_ips))
+                for i in range(args.channels * args.listeners)
+            ]
+            tasks = [asyncio.create_task(listener.run()) for listener in listeners]
+            await asyncio.sleep(seconds)
+            for listener in listeners:
+                listener.stop()
+            await asyncio.gather(*tasks)
+            return listeners
+
+        await listen(args.warmup)
+        await asyncio.sleep(0.5)  # let streamers notice the listeners left
+        positions = {s.playlist_name: s.position() for s in service.streamers.values()}
+        before = resource_snapshot()
+        await asyncio.sleep(args.idle)
+        after = resource_snapshot()
+        returning = await listen(args.settle)
+
+        streamers = list(service.streamers.values())
+        stats = [s.stats() for s in streamers]
+        await loop.run_in_executor(None, server.stop)
+        return {
+            "idle_sec": round(after["t"] - before["t"], 1),
+            "idle_cpu_seconds_ffmpeg": round(after["cpu_children"] - before["cpu_children"], 2),
+            "cpu_seconds_saved_est": round(sum(st["cpu_seconds_saved_est"] for st in stats), 2),
+            "cold_start_ms": summarize([st["cold_start_ms"] / 1000 for st in stats if st["cold_start_ms"] is not None]),
+            "wake_ms": {st["playlist"]: st["wake_latency"] for st in stats},
+            "resumed_same_track": sum(
+                1 for s in streamers if positions.get(s.playlist_name, {}).get("index") == s.track_index
+            ),
+            "returning_listeners": _listener_report(returning, args.settle),
+        }
+
+    original = streamer_module.HIBERNATION_ENABLED
+    try:
+        enabled = await run(True)
+        disabled = await run(False)
+    finally:
+        streamer_module.HIBERNATION_ENABLED = original
+
+    baseline = disabled["idle_cpu_seconds_ffmpeg"]
+    return {
+        "channels": args.channels,
+        "hibernation": enabled,
+        "always_on": disabled,
+        "idle_ffmpeg_cpu_saved_pct": (
+            round(100 * (baseline - enabled["idle_cpu_seconds_ffmpeg"]) / baseline, 1) if baseline else None
+        ),
+    }
+
+
+async def catalog(args, catalog) -> dict:
+    """Catalog API latency and size: first request, repeat, gzip and ETag revalidation."""
+    from catalog import Catalog
+    from loudness import analyze_tracks
+
+    service = make_service()
+    loop = asyncio.get_running_loop()
+    # Fills in track durations, then rebuilds the catalog
+    analysis = await loop.run_in_executor(None, analyze_tracks)
+    started = time.perf_counter()
+    Catalog()
+    build_ms = (time.perf_counter() - started) * 1000
+    server = BenchServer(service).start()
+
+    paths = {
+        "playlists": "/playlists",
+        "catalog_playlists": "/catalog/playlists",
+        "playlist_contents": f"/catalog/playlists/{catalog['playlists'][0]}?per_page=500",
+        "track_search": "/catalog/tracks?prefix=bench_track_0",
+    }
+
+    async def timed(path: str, headers: dict | None = None):
+        started = time.perf_counter()
+        status, response_headers, reader, writer = await http_request(server.host, server.port, path, headers=headers)
+        try:
+            body = await reader.read()
+        finally:
+            writer.close()
+        return status, response_headers, len(body), time.perf_counter() - started
+
+    results = {}
+    for name, path in paths.items():
+        status, headers, size, first = await timed(path)
+        repeat = [(await timed(path))[3] for _ in range(args.samples)]
+        gzip_status, gzip_headers, gzip_size, _ = await timed(path, {"Accept-Encoding": "gzip"})
+        gzipped = [(await timed(path, {"Accept-Encoding": "gzip"}))[3] for _ in range(args.samples)]
+        etag = headers.get("etag")
+        revalidate_status = None
+        revalidate = []
+        if etag:
+            for _ in range(args.samples):
+                revalidate_status, _, _, latency = await timed(path, {"If-None-Match": etag})
+                revalidate.append(latency)
+        results[name] = {
+            "status": status,
+            "bytes": size,
+            "gzip_bytes": gzip_size if gzip_headers.get("content-encoding") == "gzip" else None,
+            "first_ms": round(first * 1000, 2),
+            "repeat_ms": summarize(repeat),
+            "gzip_ms": summarize(gzipped),
+            "revalidate_status": revalidate_status,
+            "revalidate_ms": summarize(revalidate),
+        }
+
+    await loop.run_in_executor(None, server.stop)
+    return {
+        "tracks": args.tracks,
+        "playlists": args.playlists,
+        "durations_known": analysis.get("analyzed", 0) + analysis.get("durations_probed", 0),
+        "catalog_build_ms": round(build_ms, 2),
+        "endpoints": results,
+    }
+
+
+SCENARIOS = {
+    "soak": soak,
+    "commands": soak,
+    "reload": soak,
+    "capacity": capacity,
+    "abuse": abuse,
+    "restart": restart,
+    "restart_process": restart_process,
+    "middleware": middleware,
+    "track_start": track_start,
+    "passthrough": passthrough,
+    "hibernate": hibernate,
+    "catalog": catalog,
+}
@@ -0,0 +1,216 @@
+"""Precomputed catalog responses for the host UI.
+
+A Catalog is built once from the track and playlist registries (rebuilt on
+reload) and serves pages as pre-encoded JSON, with a gzip copy and an ETag,
+so repeat requests cost a dict lookup. The version is a hash of the catalog
+contents, so ETags stay valid across restarts until the data changes.
+
+Track durations come from the loudness registry; with loudness analysis
+disabled, start_duration_backfill() probes them instead.
+"""
+
+import bisect
+import collections
+import gzip
+import hashlib
+import json
+import logging
+import threading
+
+from config import CATALOG_CACHE_ENTRIES
+from tracks import get_all_track_keys, get_track_filename, get_track_loudness
+from playlists import get_all_playlists, get_playlist
+from probe import cached_probe, probe_track
+from track_sources import get_track_source
+
+logger = logging.getLogger("radio.catalog")
+
+# Smaller bodies aren't worth compressing
+_GZIP_MIN_BYTES = 1024
+
+
+class CachedResponse:
+    __slots__ = ("body", "gzip_body", "etag")
+
+    def __init__(self, payload: dict):
+        self.body = json.dumps(payload, separators=(",", ":")).encode()
+        self.gzip_body = gzip.compress(self.body, 6) if len(self.body) >= _GZIP_MIN_BYTES else None
+        # Weak: the gzip and identity encodings share it
+        self.etag = f'W/"{hashlib.sha1(self.body).hexdigest()[:20]}"'
+
+
+def _duration(filename: str | None) -> float | None:
+    if not filename:
+        return None
+    entry = get_track_loudness(filename)
+    if entry and entry.get("duration"):
+        return entry["duration"]
+    info = cached_probe(filename)
+    return (info.get("duration") or None) if info else None
+
+
+def _page(items: list, page: int, per_page: int) -> dict:
+    start = (page - 1) * per_page
+    return {
+        "page": page,
+        "per_page": per_page,
+        "total": len(items),
+        "pages": (len(items) + per_page - 1) // per_page,
+        "items": items[start : start + per_page],
+    }
+
+
+class Catalog:
+    def __init__(self):
+        self.tracks = {}  # Track Key -> {"key", "duration_sec", "available"}
+        for key in get_all_track_keys():
+            duration = _duration(get_track_filename(key))
+            self.tracks[key] = {
+                "key": key,
+                "duration_sec": round(duration, 2) if duration else None,
+                "available": True,
+            }
+        # (lowercased key, key), sorted for prefix search
+        self._search_index = sorted((key.lower(), key) for key in self.tracks)
+
+        self.playlists = {}  # Playlist Title -> {"name", "tracks", "duration_sec", "durations_known"}
+        self.contents = {}  # Playlist Title -> track entries in playlist order
+        for name in get_all_playlists():
+            entries = [
+                self.tracks.get(key, {"key": key, "duration_sec": None, "available": False})
+                for key in get_playlist(name) or []
+            ]
+            known = [e["duration_sec"] for e in entries if e["duration_sec"] is not None]
+            self.contents[name] = entries
+            self.playlists[name] = {
+                "name": name,
+                "tracks": len(entries),
+                "duration_sec": round(sum(known), 2),
+                "durations_known": len(known),
+            }
+
+        digest = hashlib.sha1(
+            json.dumps([self.tracks, self.playlists, self.contents], sort_keys=True).encode()
+        )
+        self.version = digest.hexdigest()[:12]
+        self._responses = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key: tuple, build) -> CachedResponse | None:
+        with self._lock:
+            response = self._responses.get(key)
+            if response is not None:
+                self._responses.move_to_end(key)
+                return response
+        payload = build()
+        if payload is None:
+            return None
+        response = CachedResponse({"version": self.version, **payload})
+        with self._lock:
+            self._responses[key] = response
+            while len(self._responses) > CATALOG_CACHE_ENTRIES:
+                self._responses.popitem(last=False)
+        return response
+
+    def playlist_names(self) -> CachedResponse:
+        """Body of the legacy /playlists route."""
+        return self._cached(("names",), lambda: {"playlists": list(self.playlists)})
+
+    def playlists_page(self, page: int, per_page: int) -> CachedResponse:
+        return self._cached(
+            ("playlists", page, per_page),
+            lambda: _page(list(self.playlists.values()), page, per_page),
+        )
+
+    def playlist_page(self, name: str, page: int, per_page: int) -> CachedResponse | None:
+        """One page of a playlist's tracks, or None if there is no such playlist."""
+        if name not in self.playlists:
+            return None
+        return self._cached(
+            ("playlist", name, page, per_page),
+            lambda: {**self.playlists[name], **_page(self.contents[name], page, per_page)},
+        )
+
+    def search_tracks(self, prefix: str, page: int, per_page: int) -> CachedResponse:
+        """Tracks whose key starts with `prefix` (case-insensitive), sorted by key."""
+        lowered_prefix = prefix.lower()
+
+        def build():
+            index = self._search_index
+            matches = []
+            for i in range(bisect.bisect_left(index, (lowered_prefix,)), len(index)):
+                lowered, key = index[i]
+                if not lowered.startswith(lowered_prefix):
+                    break
+                matches.append(self.tracks[key])
+            return {"prefix": prefix, **_page(matches, page, per_page)}
+
+        return self._cached(("search", prefix, page, per_page), build)
+
+
+_catalog: Catalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> Catalog:
+    """The current catalog, built on first use."""
+    if _catalog is None:
+        rebuild_catalog()
+    return _catalog
+
+
+_backfill_lock = threading.Lock()
+
+
+def backfill_durations(source=None) -> int:
+    """Probe every track whose duration is unknown, then rebuild the catalog.
+
+    Returns the number of durations found. Concurrent calls are skipped.
+    """
+    if not _backfill_lock.acquire(blocking=False):
+        logger.info("[Catalog] Duration backfill already running, skipping")
+        return 0
+    try:
+        source = source or get_track_source()
+        missing = {
+            filename
+            for filename in map(get_track_filename, get_all_track_keys())
+            if filename and _duration(filename) is None
+        }
+        if not missing:
+            return 0
+        logger.info(f"[Catalog] Probing durations of {len(missing)} tracks...")
+        found = 0
+        for filename in sorted(missing):
+            backend = source.source_for(filename)
+            if backend is None:
+                continue
+            info = probe_track(filename, backend.get_input(filename))
+            if info and info.get("duration"):
+                found += 1
+        if found:
+            rebuild_catalog()
+        logger.info(f"[Catalog] Found {found}/{len(missing)} durations")
+        return found
+    finally:
+        _backfill_lock.release()
+
+
+def start_duration_backfill() -> threading.Thread:
+    """Run backfill_durations() on a daemon thread."""
+    thread = threading.Thread(target=backfill_durations, daemon=True)
+    thread.start()
+    return thread
+
+
+def rebuild_catalog():
+    """Rebuild from the registries; requests keep using the old catalog meanwhile."""
+    global _catalog
+    with _catalog_lock:
+        catalog = Catalog()
+        if _catalog is None or catalog.version != _catalog.version:
+            logger.info(
+                f"[Catalog] Built version {catalog.version}: "
+                f"{len(catalog.playlists)} playlists, {len(catalog.tracks)} tracks"
+            )
+            _catalog = catalog
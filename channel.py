@@ -1,6 +1,6 @@
 import logging
 
-from streamer import AudioStreamer
+from streamer import ensure_streamer
 
 logger = logging.getLogger("radio")
 
@@ -11,23 +11,16 @@ class Channel:
         self.current_playlist = None
 
     def play_playlist(self, playlist_name: str, streamers: dict):
+        # Also revives the streamer if it exited after going idle
+        new_streamer = ensure_streamer(streamers, playlist_name)
         if self.current_playlist == playlist_name:
             return
 
         old_playlist = self.current_playlist
         self.current_playlist = playlist_name
 
-        if (
-            playlist_name not in streamers
-            or not streamers[playlist_name].thread.is_alive()
-        ):
-            streamer = AudioStreamer(playlist_name=playlist_name)
-            streamers[playlist_name] = streamer
-            streamer.start()
-
         if old_playlist and old_playlist in streamers:
             old_streamer = streamers[old_playlist]
-            new_streamer = streamers[playlist_name]
 
             if self.name in old_streamer.listener_queues:
                 for q in list(old_streamer.listener_queues[self.name]):
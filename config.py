@@ -11,6 +11,41 @@ IDLE_TIMEOUT = int(os.getenv("IDLE_TIMEOUT", "600"))
 SILENCE_PATH = os.getenv("SILENCE_PATH", "silence.mp3")
 MUSIC_BASE_DIR = os.getenv("MUSIC_BASE_DIR", "music")
 
+# Track source: "cloudfront", "local" (files under MUSIC_BASE_DIR) or "auto" (local if present)
+TRACK_SOURCE = os.getenv("TRACK_SOURCE", "cloudfront").lower()
+
+# Output format; tracks already in this format are streamed without re-encoding
+OUTPUT_SAMPLE_RATE = int(os.getenv("OUTPUT_SAMPLE_RATE", "44100"))
+OUTPUT_BITRATE_KBPS = int(os.getenv("OUTPUT_BITRATE_KBPS", "128"))
+OUTPUT_CHANNELS = int(os.getenv("OUTPUT_CHANNELS", "2"))
+PASSTHROUGH_ENABLED = os.getenv("PASSTHROUGH_ENABLED", "true").lower() == "true"
+FFPROBE_TIMEOUT = int(os.getenv("FFPROBE_TIMEOUT", "15"))
+
+# Loudness normalization (EBU R128, measured once per track and cached)
+LOUDNESS_ENABLED = os.getenv("LOUDNESS_ENABLED", "true").lower() == "true"
+LOUDNESS_TARGET_LUFS = float(os.getenv("LOUDNESS_TARGET_LUFS", "-16"))
+LOUDNESS_MAX_GAIN_DB = float(os.getenv("LOUDNESS_MAX_GAIN_DB", "12"))
+# Skip the gain for tracks that can be passed through (saves a re-encode, leaves them unnormalized)
+LOUDNESS_PREFER_PASSTHROUGH = os.getenv("LOUDNESS_PREFER_PASSTHROUGH", "false").lower() == "true"
+LOUDNESS_PASSTHROUGH_TOLERANCE_DB = float(os.getenv("LOUDNESS_PASSTHROUGH_TOLERANCE_DB", "1.0"))
+LOUDNESS_CACHE_PATH = os.getenv("LOUDNESS_CACHE_PATH", "loudness.json")
+# Analysis runs in the background beside the realtime encoders; keep it small and niced
+LOUDNESS_WORKERS = int(os.getenv("LOUDNESS_WORKERS", "1"))
+LOUDNESS_NICE = int(os.getenv("LOUDNESS_NICE", "10"))
+LOUDNESS_TIMEOUT = int(os.getenv("LOUDNESS_TIMEOUT", "600"))
+
+# Listener admission control (0 = unlimited)
+MAX_LISTENERS_PER_IP = int(os.getenv("MAX_LISTENERS_PER_IP", "4"))
+MAX_LISTENERS_PER_USER = int(os.getenv("MAX_LISTENERS_PER_USER", "4"))
+MAX_LISTENERS_PER_CHANNEL = int(os.getenv("MAX_LISTENERS_PER_CHANNEL", "200"))
+MAX_LISTENERS_TOTAL = int(os.getenv("MAX_LISTENERS_TOTAL", "1000"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "30"))
+
+# Catalog API pagination and response cache
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", "100"))
+CATALOG_MAX_PAGE_SIZE = int(os.getenv("CATALOG_MAX_PAGE_SIZE", "500"))
+CATALOG_CACHE_ENTRIES = int(os.getenv("CATALOG_CACHE_ENTRIES", "512"))
+
 # Track registry
 TRACKS_CSV_PATH = os.getenv("TRACKS_CSV_PATH", "tracks.csv")
 
@@ -24,16 +59,49 @@ ADMIN_EMAILS = [e.strip() for e in os.getenv("ADMIN_EMAILS", "").split(",") if e
 DEV_MODE = os.getenv("DEV_MODE", "").lower() == "true"
 DEV_USER_EMAIL = os.getenv("DEV_USER_EMAIL", "dev@localhost")
 
-# CloudFront configuration
-CLOUDFRONT_DOMAIN = os.getenv("CLOUDFRONT_DOMAIN") or exit("CLOUDFRONT_DOMAIN is required")
-CLOUDFRONT_KEY_ID = os.getenv("CLOUDFRONT_KEY_ID") or exit("CLOUDFRONT_KEY_ID is required")
-CLOUDFRONT_PRIVATE_KEY_PATH = os.getenv("CLOUDFRONT_PRIVATE_KEY_PATH") or exit("CLOUDFRONT_PRIVATE_KEY_PATH is required")
+# CloudFront configuration (not needed when serving purely from local disk)
+if TRACK_SOURCE == "local":
+    CLOUDFRONT_DOMAIN = os.getenv("CLOUDFRONT_DOMAIN", "")
+    CLOUDFRONT_KEY_ID = os.getenv("CLOUDFRONT_KEY_ID", "")
+    CLOUDFRONT_PRIVATE_KEY_PATH = os.getenv("CLOUDFRONT_PRIVATE_KEY_PATH", "")
+else:
+    CLOUDFRONT_DOMAIN = os.getenv("CLOUDFRONT_DOMAIN") or exit("CLOUDFRONT_DOMAIN is required")
+    CLOUDFRONT_KEY_ID = os.getenv("CLOUDFRONT_KEY_ID") or exit("CLOUDFRONT_KEY_ID is required")
+    CLOUDFRONT_PRIVATE_KEY_PATH = os.getenv("CLOUDFRONT_PRIVATE_KEY_PATH") or exit("CLOUDFRONT_PRIVATE_KEY_PATH is required")
 
 # Server configuration
 HOST = os.getenv("HOST", "0.0.0.0")
 PORT = int(os.getenv("PORT", "5000"))
 LOGIN_URL = os.getenv("LOGIN_URL", "https://farreachco.com/login")
 
+# FFmpeg supervision: retries with exponential backoff, then quarantine
+FFMPEG_MAX_RETRIES = int(os.getenv("FFMPEG_MAX_RETRIES", "3"))
+FFMPEG_RETRY_BASE_DELAY = float(os.getenv("FFMPEG_RETRY_BASE_DELAY", "1.0"))
+FFMPEG_RETRY_MAX_DELAY = float(os.getenv("FFMPEG_RETRY_MAX_DELAY", "30"))
+FFMPEG_MIN_SPEED = float(os.getenv("FFMPEG_MIN_SPEED", "0.95"))
+# Seconds a network read may stall before ffmpeg gives up (and is retried)
+FFMPEG_RW_TIMEOUT = float(os.getenv("FFMPEG_RW_TIMEOUT", "10"))
+QUARANTINE_AFTER_FAILURES = int(os.getenv("QUARANTINE_AFTER_FAILURES", "2"))
+QUARANTINE_SECONDS = int(os.getenv("QUARANTINE_SECONDS", "3600"))
+
+# Idle streamers stop ffmpeg once the last listener has been gone this long
+# and resume from the same position when someone tunes back in
+HIBERNATION_ENABLED = os.getenv("HIBERNATION_ENABLED", "true").lower() == "true"
+HIBERNATE_GRACE_SECONDS = float(os.getenv("HIBERNATE_GRACE_SECONDS", "0"))
+
+# Playlists kept streaming ahead of peak hours: "playlist@HH:MM-HH:MM,..." (local time)
+PREWARM_SCHEDULE = os.getenv("PREWARM_SCHEDULE", "")
+PREWARM_CHECK_INTERVAL = int(os.getenv("PREWARM_CHECK_INTERVAL", "30"))
+
+# Tracing and profiling (toggle at runtime via /admin/tracing and /admin/profiler)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "").lower() == "true"
+TRACE_SPANS_PER_STREAMER = int(os.getenv("TRACE_SPANS_PER_STREAMER", "500"))
+PROFILER_MAX_SECONDS = int(os.getenv("PROFILER_MAX_SECONDS", "300"))
+
+# Shutdown / hot restart
+SHUTDOWN_GRACE_SECONDS = int(os.getenv("SHUTDOWN_GRACE_SECONDS", "10"))
+RESTART_STATE_PATH = os.getenv("RESTART_STATE_PATH", "radio_state.json")
+
 # Session configuration
 SESSION_COOKIE_NAME = os.getenv("SESSION_COOKIE_NAME", "frc_session")
 SESSION_SECRET = os.getenv("SESSION_SECRET") or exit("SESSION_SECRET is required")
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Background EBU R128 loudness analysis.
+
+Measures integrated loudness once per track file with ffmpeg's ebur128
+filter and stores it in the track registry (see tracks.py). Streamers then
+apply a cheap fixed gain at playback instead of running two-pass loudnorm.
+The same pass records each track's duration for the catalog; tracks measured
+before durations were kept get theirs from a quick ffprobe instead.
+
+Usage:
+    python loudness.py
+
+Runs one incremental analysis pass and prints throughput.
+"""
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from config import (
+    LOUDNESS_TARGET_LUFS,
+    LOUDNESS_MAX_GAIN_DB,
+    LOUDNESS_WORKERS,
+    LOUDNESS_TIMEOUT,
+    LOUDNESS_NICE,
+)
+from tracks import (
+    get_all_track_keys,
+    get_track_filename,
+    get_track_loudness,
+    set_track_loudness,
+    set_track_duration,
+    save_loudness,
+)
+from track_sources import get_track_source
+from probe import probe_track
+from catalog import rebuild_catalog
+
+logger = logging.getLogger("radio.loudness")
+
+_INTEGRATED_PATTERN = re.compile(r"I:\s+(-?\d+(?:\.\d+)?) LUFS")
+_DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)")
+
+# Give up on a network read that stalls this long (microseconds)
+_RW_TIMEOUT_US = 30_000_000
+
+# Below this the track is effectively silent; don't try to boost it
+_SILENCE_LUFS = -60.0
+
+_analysis_lock = threading.Lock()
+_last_run: dict = {}
+
+
+def measure_loudness(track_input: str) -> dict | None:
+    """Return {"lufs": integrated loudness, "duration": seconds or None}, or None on failure."""
+    try:
+        proc = subprocess.Popen(
+            [
+                "ffmpeg",
+                "-hide_banner",
+                "-nostats",
+                # A hung fetch must not hold the analysis lock forever
+                *(["-rw_timeout", str(_RW_TIMEOUT_US)] if "://" in track_input else []),
+                "-i",
+                track_input,
+                "-vn",
+                "-af",
+                "ebur128",
+                "-f",
+                "null",
+                "-",
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+    except FileNotFoundError:
+        logger.error("FFmpeg not found in PATH")
+        return None
+
+    # Background work: yield the CPU to the realtime encoders feeding listeners
+    try:
+        os.setpriority(os.PRIO_PROCESS, proc.pid, LOUDNESS_NICE)
+    except (AttributeError, OSError):
+        pass
+
+    try:
+        _, stderr = proc.communicate(timeout=LOUDNESS_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        # The track stays unmeasured and is retried on the next pass
+        logger.warning(f"[Loudness] Analysis timed out after {LOUDNESS_TIMEOUT}s")
+        return None
+
+    # Per-frame lines also match; the summary printed last is the integrated value
+    matches = _INTEGRATED_PATTERN.findall(stderr)
+    if proc.returncode != 0 or not matches:
+        logger.warning(f"[Loudness] Analysis failed (exit {proc.returncode})")
+        return None
+    duration = _DURATION_PATTERN.search(stderr)
+    return {
+        "lufs": float(matches[-1]),
+        "duration": (
+            int(duration[1]) * 3600 + int(duration[2]) * 60 + float(duration[3])
+            if duration
+            else None
+        ),
+    }
+
+
+def get_gain_db(filename: str) -> float:
+    """Playback gain in dB to bring a track to LOUDNESS_TARGET_LUFS (0 if unmeasured)."""
+    entry = get_track_loudness(filename)
+    if not entry or entry["lufs"] <= _SILENCE_LUFS:
+        return 0.0
+    gain = LOUDNESS_TARGET_LUFS - entry["lufs"]
+    return max(-LOUDNESS_MAX_GAIN_DB, min(LOUDNESS_MAX_GAIN_DB, gain))
+
+
+def _pending_tracks(source) -> tuple[list[tuple[str, str, str]], list[tuple[str, str]]]:
+    """Track files that are new or changed since they were last measured,
+    and measured files whose duration is not yet known."""
+    pending = []
+    no_duration = []
+    seen = set()
+    for key in get_all_track_keys():
+        filename = get_track_filename(key)
+        if not filename or filename in seen:
+            continue
+        seen.add(filename)
+
+        backend = source.source_for(filename)
+        if backend is None:
+            continue
+        sig = backend.signature(filename)
+        entry = get_track_loudness(filename)
+        if entry and entry.get("sig") == sig:
+            if entry.get("duration") is None:
+                no_duration.append((filename, backend.get_input(filename)))
+            continue
+        pending.append((filename, backend.get_input(filename), sig))
+    return pending, no_duration
+
+
+def analyze_tracks(source=None, workers: int = LOUDNESS_WORKERS) -> dict:
+    """Measure every new or changed track, `workers` ffmpeg processes at a time.
+
+    Returns run statistics. Concurrent calls are skipped rather than queued.
+    """
+    global _last_run
+    if not _analysis_lock.acquire(blocking=False):
+        logger.info("[Loudness] Analysis already running, skipping")
+        return _last_run
+
+    try:
+        source = source or get_track_source()
+        started = time.time()
+        pending, no_duration = _pending_tracks(source)
+        analyzed = failed = probed = 0
+
+        if pending:
+            logger.info(f"[Loudness] Analyzing {len(pending)} tracks with {workers} workers...")
+        if no_duration:
+            logger.info(f"[Loudness] Probing durations of {len(no_duration)} tracks...")
+
+        # Each worker blocks on its own ffmpeg child, so threads are enough
+        # to keep every core busy.
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futures = {
+                pool.submit(measure_loudness, track_input): (filename, sig)
+                for filename, track_input, sig in pending
+            }
+            for future in as_completed(futures):
+                filename, sig = futures[future]
+                result = future.result()
+                if result is None:
+                    failed += 1
+                    continue
+                set_track_loudness(filename, result["lufs"], sig, result["duration"])
+                analyzed += 1
+
+            futures = {
+                pool.submit(probe_track, filename, track_input): filename
+                for filename, track_input in no_duration
+            }
+            for future in as_completed(futures):
+                info = future.result()
+                if info and info.get("duration"):
+                    set_track_duration(futures[future], info["duration"])
+                    probed += 1
+
+        if analyzed or probed:
+            save_loudness()
+            # Playlist durations in the catalog come from these entries
+            rebuild_catalog()
+
+        elapsed = time.time() - started
+        _last_run = {
+            "finished_at": time.time(),
+            "analyzed": analyzed,
+            "failed": failed,
+            "durations_probed": probed,
+            "elapsed_sec": round(elapsed, 2),
+            "tracks_per_sec": round(analyzed / elapsed, 2) if elapsed > 0 else 0.0,
+            "workers": workers,
+        }
+        if pending:
+            logger.info(
+                f"[Loudness] Analyzed {analyzed} tracks ({failed} failed) in "
+                f"{elapsed:.1f}s ({_last_run['tracks_per_sec']} tracks/s)"
+            )
+        return _last_run
+    finally:
+        _analysis_lock.release()
+
+
+def start_background_analysis() -> threading.Thread:
+    """Run analyze_tracks() on a daemon thread."""
+    thread = threading.Thread(target=analyze_tracks, daemon=True)
+    thread.start()
+    return thread
+
+
+def get_analysis_status() -> dict:
+    """Statistics from the last completed analysis run."""
+    return {"running": _analysis_lock.locked(), "last_run": _last_run}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s - %(message)s"
+    )
+    print(analyze_tracks())
@@ -0,0 +1,106 @@
+"""Keep scheduled playlists streaming ahead of peak hours.
+
+PREWARM_SCHEDULE lists "playlist@HH:MM-HH:MM" windows in local time. A window
+may wrap past midnight; equal start and end means all day. Inside a window the
+playlist's streamer is started if needed and marked keep_warm, so it neither
+hibernates nor exits and the first listener gets audio immediately.
+"""
+
+import datetime
+import logging
+import threading
+
+from config import PREWARM_SCHEDULE, PREWARM_CHECK_INTERVAL
+from playlists import get_playlist
+from streamer import ensure_streamer
+
+logger = logging.getLogger("radio.prewarm")
+
+
+def _parse_time(value: str) -> datetime.time:
+    hour, minute = value.strip().split(":")
+    return datetime.time(int(hour), int(minute))
+
+
+def parse_schedule(spec: str) -> list[tuple[str, datetime.time, datetime.time]]:
+    """Parse "playlist@HH:MM-HH:MM,..." into (playlist, start, end) windows."""
+    windows = []
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            playlist, hours = entry.rsplit("@", 1)
+            start, end = hours.split("-")
+            windows.append((playlist.strip(), _parse_time(start), _parse_time(end)))
+        except ValueError:
+            logger.warning(f"[Prewarm] Ignoring invalid schedule entry: '{entry}'")
+    return windows
+
+
+def in_window(now: datetime.time, start: datetime.time, end: datetime.time) -> bool:
+    if start == end:
+        return True  # all day
+    if start < end:
+        return start <= now < end
+    return now >= start or now < end
+
+
+class PrewarmScheduler:
+    def __init__(self, streamers: dict, spec: str = PREWARM_SCHEDULE, interval: int = PREWARM_CHECK_INTERVAL):
+        self.streamers = streamers
+        self.windows = parse_schedule(spec)
+        self.interval = interval
+        self.warm = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if not self.windows or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, daemon=True, name="prewarm")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            try:
+                self.tick()
+            except Exception:
+                logger.exception("[Prewarm] Schedule check failed")
+            if self._stop.wait(self.interval):
+                return
+
+    def tick(self, now: datetime.datetime | None = None):
+        """Start streamers whose window is open and release those whose window closed."""
+        clock = (now or datetime.datetime.now()).time()
+        due = {name for name, start, end in self.windows if in_window(clock, start, end)}
+
+        for name in due:
+            if get_playlist(name) is None:
+                continue
+            streamer = ensure_streamer(self.streamers, name)
+            if not streamer.keep_warm:
+                logger.info(f"[Prewarm] Warming '{name}'")
+                streamer.keep_warm = True
+                streamer.put_command("wake")
+
+        for name in self.warm - due:
+            streamer = self.streamers.get(name)
+            if streamer is not None:
+                logger.info(f"[Prewarm] Window for '{name}' closed")
+                streamer.keep_warm = False
+        self.warm = due
+
+    def status(self) -> dict:
+        return {
+            "schedule": [
+                {"playlist": name, "start": start.strftime("%H:%M"), "end": end.strftime("%H:%M")}
+                for name, start, end in self.windows
+            ],
+            "warm": sorted(self.warm),
+        }
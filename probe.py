@@ -0,0 +1,107 @@
+"""ffprobe-based format detection, cached per track file."""
+
+import json
+import logging
+import subprocess
+import threading
+
+from config import FFPROBE_TIMEOUT, OUTPUT_SAMPLE_RATE, OUTPUT_BITRATE_KBPS, OUTPUT_CHANNELS
+
+logger = logging.getLogger("radio.probe")
+
+# Probe cache: File Name -> stream info dict
+_probes: dict[str, dict] = {}
+_probes_lock = threading.Lock()
+
+# Passthrough sources must be within this share of the target bitrate
+# (ffprobe reports an average, so CBR files land slightly off)
+_BITRATE_BAND = 0.05
+
+
+def _run_ffprobe(track_input: str) -> dict | None:
+    try:
+        result = subprocess.run(
+            [
+                "ffprobe",
+                "-v",
+                "warning",
+                "-select_streams",
+                "a:0",
+                "-show_entries",
+                "stream=codec_name,sample_rate,channels,bit_rate:format=duration",
+                "-of",
+                "json",
+                track_input,
+            ],
+            capture_output=True,
+            text=True,
+            timeout=FFPROBE_TIMEOUT,
+        )
+    except FileNotFoundError:
+        logger.error("FFprobe not found in PATH")
+        return None
+    except subprocess.TimeoutExpired:
+        logger.warning("[Probe] ffprobe timed out")
+        return None
+
+    if result.returncode != 0:
+        logger.warning(f"[Probe] ffprobe failed: {result.stderr.strip()}")
+        return None
+
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        return None
+    streams = data.get("streams", [])
+    if not streams:
+        return None
+
+    stream = streams[0]
+    return {
+        "codec": stream.get("codec_name"),
+        "sample_rate": int(stream.get("sample_rate") or 0),
+        "channels": int(stream.get("channels") or 0),
+        "bit_rate": int(stream.get("bit_rate") or 0),
+        "duration": float(data.get("format", {}).get("duration") or 0),
+        # VBR or Xing-less MP3s: the duration is only a guess
+        "duration_estimated": "Estimating duration from bitrate" in result.stderr,
+    }
+
+
+def probe_track(filename: str, track_input: str) -> dict | None:
+    """Get stream info for a track, running ffprobe only until it first succeeds."""
+    with _probes_lock:
+        if filename in _probes:
+            return _probes[filename]
+
+    info = _run_ffprobe(track_input)
+    if info:
+        # Failures aren't cached; they are often transient (network, timeout)
+        with _probes_lock:
+            _probes[filename] = info
+        logger.info(f"[Probe] {filename}: {info}")
+    return info
+
+
+def cached_probe(filename: str) -> dict | None:
+    """Stream info from an earlier successful probe, without running ffprobe."""
+    with _probes_lock:
+        return _probes.get(filename)
+
+
+def can_passthrough(info: dict | None) -> bool:
+    """True if the source can be copied to the output without re-encoding."""
+    if not info:
+        return False
+    return (
+        info["codec"] == "mp3"
+        and info["sample_rate"] == OUTPUT_SAMPLE_RATE
+        and info["channels"] == OUTPUT_CHANNELS
+        and abs(info["bit_rate"] - OUTPUT_BITRATE_KBPS * 1000) <= OUTPUT_BITRATE_KBPS * 1000 * _BITRATE_BAND
+    )
+
+
+def clear_probe_cache():
+    """Forget cached probes (e.g. after the track registry is reloaded)."""
+    with _probes_lock:
+        _probes.clear()
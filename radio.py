@@ -1,18 +1,23 @@
-import base64
-import hashlib
-import hmac
+import json
+import os
 import queue
 import re
 import signal
-import urllib.parse
+import socket
+import subprocess
+import sys
+import threading
+import time
 import logging
+from contextlib import asynccontextmanager
 import psycopg2
 import uvicorn
 
-from fastapi import FastAPI, Request, Response, Depends, HTTPException
+from fastapi import FastAPI, Request, Response, Depends, HTTPException, Query
 from fastapi.responses import FileResponse, StreamingResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -20,19 +25,33 @@ from slowapi.errors import RateLimitExceeded
 from config import (
     LISTENER_QUEUE_MAXSIZE,
     SILENT_BUFFER,
-    SESSION_COOKIE_NAME,
-    SESSION_SECRET,
     SESSION_DB_DSN,
     HOST,
     PORT,
     LOGIN_URL,
     ADMIN_EMAILS,
+    ADMISSION_RETRY_AFTER,
     DEV_MODE,
     DEV_USER_EMAIL,
+    LOUDNESS_ENABLED,
+    CATALOG_PAGE_SIZE,
+    CATALOG_MAX_PAGE_SIZE,
+    SHUTDOWN_GRACE_SECONDS,
+    RESTART_STATE_PATH,
+    TRACE_SPANS_PER_STREAMER,
 )
 from tracks import reload_tracks
-from playlists import get_playlist, get_all_playlists, reload_playlists
+from playlists import get_playlist, reload_playlists
+from catalog import get_catalog, rebuild_catalog, start_duration_backfill
+from probe import clear_probe_cache
+from supervisor import quarantined_tracks, clear_quarantine
+from loudness import start_background_analysis, get_analysis_status
 from channel import Channel
+from streamer import AudioStreamer
+from admission import AdmissionController
+from prewarm import PrewarmScheduler
+from sessions import LazySession, SessionMiddleware
+from tracing import set_tracing, tracing_enabled, profiler
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s - %(message)s"
@@ -40,6 +59,11 @@ logging.basicConfig(
 logger = logging.getLogger("radio")
 logger.level = logging.INFO
 
+# Environment handed from an old process to its replacement during hot restart
+LISTEN_FD_ENV = "RADIO_LISTEN_FD"
+RESTORE_STATE_ENV = "RADIO_RESTORE_STATE"
+HANDOFF_PID_ENV = "RADIO_HANDOFF_PID"
+
 limiter = Limiter(key_func=get_remote_address)
 
 
@@ -53,15 +77,24 @@ async def rate_limit_handler(request: Request, exc: Exception):
 
 class RadioWebService:
     MAX_CHANNEL_NAME_LENGTH = 256
+    # Routes that never need a session; the auth layer skips them entirely
+    PUBLIC_PATHS = ("/", "/robots.txt", "/listen", "/stream")
+    PUBLIC_PREFIXES = ("/static/",)
 
     def __init__(self):
-        self.app = FastAPI()
+        self.app = FastAPI(lifespan=self._lifespan)
         self.channels = {}
         self.streamers = {}
+        self.draining = threading.Event()
+        self.drain_started_at = None
+        self.admission = AdmissionController()
+        self.prewarm = PrewarmScheduler(self.streamers)
         self.app.state.limiter = limiter
         self.app.add_exception_handler(RateLimitExceeded, rate_limit_handler)
         self.app.add_middleware(
-            BaseHTTPMiddleware, dispatch=self.create_session_middleware()
+            SessionMiddleware,
+            public_paths=self.PUBLIC_PATHS,
+            public_prefixes=self.PUBLIC_PREFIXES,
         )
         self.app.mount("/static", StaticFiles(directory="static"), name="static")
         self._define_routes()
@@ -81,90 +114,117 @@ class RadioWebService:
 
         return True, name
 
-    def _get_channel(self, name: str) -> Channel:
-        if name not in self.channels:
-            logger.info(f"[Channel] Creating new channel: {name}")
-            self.channels[name] = Channel(name)
-        return self.channels[name]
-
-    def create_session_middleware(self):
-        async def session_middleware(request: Request, call_next):
-            cookie = request.cookies.get(SESSION_COOKIE_NAME)
-            if not cookie:
-                logger.info("[Session] No session cookie")
-                return await call_next(request)
-
-            valid, session_id = self.verify_express_cookie(cookie, SESSION_SECRET)
-            if not valid:
-                logger.info("[Session] Invalid signature")
-                return await call_next(request)
-
-            try:
-                with psycopg2.connect(SESSION_DB_DSN) as conn:
-                    with conn.cursor() as cur:
-                        cur.execute(
-                            "SELECT sess FROM session WHERE sid = %s AND expire > NOW()",
-                            (session_id,),
-                        )
-                        row = cur.fetchone()
-                        if not row:
-                            logger.info("[Session] Session expired or not found")
-                            return await call_next(request)
-
-                        session_data = row[0]
-                        request.state.session_data = session_data
-                        request.state.user_id = session_data.get("user")
-            except psycopg2.OperationalError as e:
-                logger.warning(f"[Session] DB connection error: {e}")
-            except psycopg2.ProgrammingError as e:
-                logger.error(f"[Session] DB query error: {e}")
-            except Exception as e:
-                logger.error(f"[Session] Unexpected error: {e}", exc_info=True)
-
-            return await call_next(request)
-
-        return session_middleware
-
-    def verify_express_cookie(self, cookie_str: str, secret: str):
-        def base64_to_base64url(s):
-            return s.replace("+", "-").replace("/", "_").rstrip("=")
-
-        cookie_str = urllib.parse.unquote(cookie_str)
-
-        if not cookie_str.startswith("s:") or len(cookie_str) < 3:
-            logger.warning(
-                "[VerifyCookie] Invalid cookie format"
-            )
-            return False, None
-
+    @staticmethod
+    def _pagination(request: Request) -> tuple[int, int]:
         try:
-            value, sig = cookie_str[2:].split(".", 1)
+            page = int(request.query_params.get("page", "1"))
+            per_page = int(request.query_params.get("per_page", str(CATALOG_PAGE_SIZE)))
         except ValueError:
-            logger.warning(
-                "[VerifyCookie] Failed to split cookie into value and signature."
+            raise HTTPException(status_code=400, detail="page and per_page must be integers")
+        if page < 1 or not 1 <= per_page <= CATALOG_MAX_PAGE_SIZE:
+            raise HTTPException(
+                status_code=400,
+                detail=f"page must be >= 1 and per_page between 1 and {CATALOG_MAX_PAGE_SIZE}",
             )
-            return False, None
-
-        expected_sig = hmac.new(
-            secret.encode(), msg=value.encode(), digestmod=hashlib.sha256
-        ).digest()
-        expected_sig_b64 = base64.urlsafe_b64encode(expected_sig).rstrip(b"=").decode()
+        return page, per_page
+
+    @staticmethod
+    def _cached_json(request: Request, cached) -> Response:
+        """Serve a precomputed catalog response with ETag revalidation and gzip."""
+        headers = {
+            "ETag": cached.etag,
+            "Cache-Control": "private, no-cache",
+            "Vary": "Accept-Encoding",
+        }
+        if_none_match = request.headers.get("if-none-match", "")
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if "*" in tags or cached.etag.removeprefix("W/") in tags:
+            return Response(status_code=304, headers=headers)
+        if cached.gzip_body is not None and "gzip" in request.headers.get("accept-encoding", ""):
+            headers["Content-Encoding"] = "gzip"
+            return Response(cached.gzip_body, media_type="application/json", headers=headers)
+        return Response(cached.body, media_type="application/json", headers=headers)
+
+    @asynccontextmanager
+    async def _lifespan(self, app: FastAPI):
+        self.prewarm.start()
+        yield
+        await run_in_threadpool(self.shutdown)
+
+    def begin_drain(self):
+        """Stop admitting listeners and let open streams flush and close."""
+        if not self.draining.is_set():
+            logger.info("[Shutdown] Draining listeners...")
+            self.drain_started_at = time.time()
+            self.draining.set()
+
+    def shutdown(self, timeout: float = 5.0):
+        """Stop every streamer and reap its ffmpeg child."""
+        self.begin_drain()
+        self.prewarm.stop()
+        streamers = list(self.streamers.values())
+        for streamer in streamers:
+            streamer.put_command("stop")
+        deadline = time.time() + timeout
+        for streamer in streamers:
+            streamer.thread.join(max(0.0, deadline - time.time()))
+        alive = sum(1 for s in streamers if s.thread.is_alive())
+        logger.info(
+            f"[Shutdown] Stopped {len(streamers) - alive}/{len(streamers)} streamers "
+            f"{time.time() - self.drain_started_at:.1f}s after drain began"
+        )
 
-        # Convert incoming cookie signature to Base64URL format
-        cookie_sig_urlsafe = base64_to_base64url(sig)
+    def export_state(self) -> dict:
+        """Channels and playback positions for a replacement process."""
+        return {
+            "channels": {
+                name: channel.current_playlist
+                for name, channel in list(self.channels.items())
+                if channel.current_playlist
+            },
+            "streamers": [
+                streamer.position()
+                for streamer in list(self.streamers.values())
+                if streamer.thread.is_alive()
+            ],
+        }
+
+    def restore_state(self, state: dict):
+        """Restart streamers at the exported positions and re-create channels."""
+        for position in state.get("streamers", []):
+            playlist_name = position["playlist"]
+            if get_playlist(playlist_name) is None:
+                continue
+            streamer = AudioStreamer(playlist_name=playlist_name, resume=position)
+            self.streamers[playlist_name] = streamer
+            streamer.start()
+
+        for name, playlist_name in state.get("channels", {}).items():
+            if get_playlist(playlist_name) is None:
+                continue
+            self._get_channel(name).play_playlist(playlist_name, self.streamers)
+        logger.info(
+            f"[Restart] Restored {len(self.channels)} channels and {len(self.streamers)} streamers"
+        )
 
-        if hmac.compare_digest(expected_sig_b64, cookie_sig_urlsafe):
-            logger.info("[VerifyCookie] Signature valid")
-            return True, value
-        else:
-            logger.info("[VerifyCookie] Signature mismatch")
-            return False, None
+    def _get_channel(self, name: str) -> Channel:
+        if name not in self.channels:
+            logger.info(f"[Channel] Creating new channel: {name}")
+            self.channels[name] = Channel(name)
+        return self.channels[name]
 
     async def login_required(self, request: Request):
         if DEV_MODE:
             request.state.user_id = 0
             request.state.dev_mode = True
             return
+
+        session = getattr(request.state, "session", None)
+        session_data = await session.load() if session else None
+        if session_data:
+            request.state.session_data = session_data
+            request.state.user_id = session_data.get("user")
+
         if not getattr(request.state, "user_id", None):
             raise HTTPException(
                 status_code=307,
@@ -172,6 +232,36 @@ class RadioWebService:
                 headers={"Location": LOGIN_URL},
             )
 
+    async def admin_required(self, request: Request):
+        await self.login_required(request)
+
+        # Check if user is in admin whitelist
+        if getattr(request.state, "dev_mode", False):
+            user_email = DEV_USER_EMAIL
+        else:
+            user_id = getattr(request.state, "user_id", None)
+            if not user_id:
+                raise HTTPException(status_code=401, detail="Unauthorized")
+
+            try:
+                with psycopg2.connect(SESSION_DB_DSN) as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(
+                            'SELECT email FROM "public"."User" WHERE id = %s',
+                            (user_id,),
+                        )
+                        row = cur.fetchone()
+                        if not row:
+                            raise HTTPException(status_code=404, detail="User not found")
+                        user_email = row[0]
+            except psycopg2.Error as e:
+                logger.error(f"[Admin] DB error: {e}")
+                raise HTTPException(status_code=500, detail="Database error")
+
+        if user_email not in ADMIN_EMAILS:
+            raise HTTPException(status_code=403, detail="Forbidden")
+        request.state.user_email = user_email
+
     def _define_routes(self):
         @self.app.get("/robots.txt")
         @limiter.limit("60/minute")
@@ -206,35 +296,124 @@ class RadioWebService:
         @limiter.limit("20/minute")
         async def admin_page(
             request: Request,
-            _: None = Depends(self.login_required),
+            _: None = Depends(self.admin_required),
         ):
-            # Check if user is in admin whitelist
-            if getattr(request.state, "dev_mode", False):
-                user_email = DEV_USER_EMAIL
-            else:
-                user_id = getattr(request.state, "user_id", None)
-                if not user_id:
-                    raise HTTPException(status_code=401, detail="Unauthorized")
+            return FileResponse("static/admin.html")
 
-                try:
-                    with psycopg2.connect(SESSION_DB_DSN) as conn:
-                        with conn.cursor() as cur:
-                            cur.execute(
-                                'SELECT email FROM "public"."User" WHERE id = %s',
-                                (user_id,),
-                            )
-                            row = cur.fetchone()
-                            if not row:
-                                raise HTTPException(status_code=404, detail="User not found")
-                            user_email = row[0]
-                except psycopg2.Error as e:
-                    logger.error(f"[Admin] DB error: {e}")
-                    raise HTTPException(status_code=500, detail="Database error")
-
-            if user_email not in ADMIN_EMAILS:
-                raise HTTPException(status_code=403, detail="Forbidden")
+        @self.app.get("/admin/admission")
+        @limiter.limit("30/minute")
+        async def admin_admission(
+            request: Request,
+            _: None = Depends(self.admin_required),
+        ):
+            return self.admission.stats()
 
-            return FileResponse("static/admin.html")
+        @self.app.get("/admin/streamers")
+        @limiter.limit("30/minute")
+        async def admin_streamers(
+            request: Request,
+            _: None = Depends(self.admin_required),
+        ):
+            streamers = [s.stats() for s in list(self.streamers.values())]
+            plays = {"passthrough": 0, "transcode": 0}
+            transcode_reasons = {"disabled": 0, "format": 0, "gain": 0}
+            for st in streamers:
+                for mode, count in st["plays"].items():
+                    plays[mode] += count
+                for reason, count in st["transcode_reasons"].items():
+                    transcode_reasons[reason] += count
+            total_plays = sum(plays.values())
+            return {
+                "streamers": streamers,
+                "hibernating": sum(1 for st in streamers if st["state"] == "hibernating"),
+                "cpu_seconds_saved_est": round(
+                    sum(st["cpu_seconds_saved_est"] for st in streamers), 2
+                ),
+                "prewarm": self.prewarm.status(),
+                "plays": plays,
+                "transcode_reasons": transcode_reasons,
+                "passthrough_pct": (
+                    round(100 * plays["passthrough"] / total_plays, 1)
+                    if total_plays
+                    else 0.0
+                ),
+                "quarantined": quarantined_tracks(),
+            }
+
+        @self.app.get("/admin/loudness")
+        @limiter.limit("30/minute")
+        async def admin_loudness(
+            request: Request,
+            _: None = Depends(self.admin_required),
+        ):
+            return get_analysis_status()
+
+        @self.app.get("/admin/spans")
+        @limiter.limit("60/minute")
+        async def admin_spans(
+            request: Request,
+            playlist: str | None = None,
+            limit: int = Query(50, ge=1, le=TRACE_SPANS_PER_STREAMER),
+            _: None = Depends(self.admin_required),
+        ):
+            return {
+                "enabled": tracing_enabled(),
+                "streamers": {
+                    name: streamer.spans.recent(limit)
+                    for name, streamer in list(self.streamers.items())
+                    if not playlist or name == playlist
+                },
+            }
+
+        @self.app.post("/admin/tracing")
+        @limiter.limit("10/minute")
+        async def admin_tracing(
+            request: Request,
+            _: None = Depends(self.admin_required),
+        ):
+            try:
+                data = await request.json()
+            except Exception:
+                return JSONResponse(status_code=400, content={"error": "Invalid JSON"})
+            if not isinstance(data, dict) or not isinstance(data.get("enabled"), bool):
+                return JSONResponse(status_code=400, content={"error": "Expected {\"enabled\": bool}"})
+
+            set_tracing(data["enabled"])
+            logger.info(f"[Admin] Tracing {'enabled' if data['enabled'] else 'disabled'} by {request.state.user_email}")
+            return {"enabled": tracing_enabled()}
+
+        @self.app.get("/admin/profiler")
+        @limiter.limit("30/minute")
+        async def admin_profiler_report(
+            request: Request,
+            _: None = Depends(self.admin_required),
+        ):
+            return profiler.report()
+
+        @self.app.post("/admin/profiler")
+        @limiter.limit("10/minute")
+        async def admin_profiler(
+            request: Request,
+            _: None = Depends(self.admin_required),
+        ):
+            try:
+                data = await request.json()
+            except Exception:
+                return JSONResponse(status_code=400, content={"error": "Invalid JSON"})
+            if not isinstance(data, dict) or data.get("action") not in ("start", "stop"):
+                return JSONResponse(status_code=400, content={"error": "Expected action start or stop"})
+
+            if data["action"] == "start":
+                try:
+                    interval_ms = float(data.get("interval_ms", 10))
+                except (TypeError, ValueError):
+                    return JSONResponse(status_code=400, content={"error": "Invalid interval_ms"})
+                profiler.start(interval=max(interval_ms, 1.0) / 1000)
+                logger.info(f"[Admin] Profiler started by {request.state.user_email}")
+            else:
+                await run_in_threadpool(profiler.stop)
+                logger.info(f"[Admin] Profiler stopped by {request.state.user_email}")
+            return profiler.report()
 
         @self.app.get("/playlists")
         @limiter.limit("30/minute")
@@ -242,49 +421,51 @@ class RadioWebService:
             request: Request,
             _: None = Depends(self.login_required),
         ):
-            return {"playlists": get_all_playlists()}
+            return self._cached_json(request, get_catalog().playlist_names())
 
-        @self.app.post("/admin/reload")
-        @limiter.limit("5/minute")
-        async def admin_reload(
+        @self.app.get("/catalog/playlists")
+        @limiter.limit("120/minute")
+        def catalog_playlists(
             request: Request,
             _: None = Depends(self.login_required),
         ):
-            # In dev mode, use configured dev email
-            if getattr(request.state, "dev_mode", False):
-                user_email = DEV_USER_EMAIL
-                logger.info(f"[Admin] Dev mode - using email: {user_email}")
-            else:
-                user_id = getattr(request.state, "user_id", None)
-                if not user_id:
-                    return {"error": "Unauthorized"}, 401
+            page, per_page = self._pagination(request)
+            return self._cached_json(request, get_catalog().playlists_page(page, per_page))
 
-                # Query users table for email
-                try:
-                    with psycopg2.connect(SESSION_DB_DSN) as conn:
-                        with conn.cursor() as cur:
-                            cur.execute(
-                                'SELECT email FROM "public"."User" WHERE id = %s',
-                                (user_id,),
-                            )
-                            row = cur.fetchone()
-                            if not row:
-                                logger.warning(f"[Admin] User {user_id} not found in users table")
-                                return {"error": "User not found"}, 404
-                            user_email = row[0]
-                except Exception as e:
-                    logger.error(f"[Admin] DB error looking up user email: {e}")
-                    return {"error": "Database error"}, 500
-
-            # Check if email is in admin whitelist
-            if user_email not in ADMIN_EMAILS:
-                logger.warning(f"[Admin] Unauthorized reload attempt by {user_email}")
-                return {"error": "Forbidden"}, 403
+        @self.app.get("/catalog/playlists/{name}")
+        @limiter.limit("120/minute")
+        def catalog_playlist(
+            request: Request,
+            name: str,
+            _: None = Depends(self.login_required),
+        ):
+            page, per_page = self._pagination(request)
+            cached = get_catalog().playlist_page(name, page, per_page)
+            if cached is None:
+                return JSONResponse(status_code=404, content={"error": "Playlist not found"})
+            return self._cached_json(request, cached)
+
+        @self.app.get("/catalog/tracks")
+        @limiter.limit("120/minute")
+        def catalog_tracks(
+            request: Request,
+            _: None = Depends(self.login_required),
+        ):
+            prefix = request.query_params.get("prefix", "")
+            if len(prefix) > 256:
+                return JSONResponse(status_code=400, content={"error": "Prefix too long"})
+            page, per_page = self._pagination(request)
+            return self._cached_json(request, get_catalog().search_tracks(prefix, page, per_page))
 
+        @self.app.post("/admin/reload")
+        @limiter.limit("5/minute")
+        async def admin_reload(
+            request: Request,
+            _: None = Depends(self.admin_required),
+        ):
             # Reload both tracks and playlists
-            logger.info(f"[Admin] Reload triggered by {user_email}")
-            reload_tracks()
-            reload_playlists()
+            logger.info(f"[Admin] Reload triggered by {request.state.user_email}")
+            _reload_data()
 
             return {"status": "ok", "message": "Tracks and playlists reloaded"}
 
@@ -339,10 +520,40 @@ class RadioWebService:
 
             channel_name = result  # Use validated/normalized name
             try:
-                channel = self._get_channel(channel_name)
-                playlist = channel.current_playlist
+                channel = self.channels.get(channel_name)
+                playlist = channel.current_playlist if channel else None
                 if not playlist or playlist not in self.streamers:
                     return Response(content="Channel not active", status_code=400)
+                if not self.streamers[playlist].thread.is_alive():
+                    # Streamer stopped after IDLE_TIMEOUT without listeners
+                    self.channels.pop(channel_name, None)
+                    return Response(content="Channel not active", status_code=400)
+
+                if self.draining.is_set():
+                    return Response(
+                        content="Server restarting",
+                        status_code=503,
+                        headers={"Retry-After": "5"},
+                    )
+
+                # Only touch the session store when a per-user quota needs it
+                user_id = None
+                if self.admission.per_user:
+                    session_data = await LazySession(request.scope).load()
+                    user_id = session_data.get("user") if session_data else None
+
+                ticket, reason = self.admission.try_admit(
+                    get_remote_address(request), user_id, channel_name
+                )
+                if ticket is None:
+                    logger.warning(
+                        f"[Stream] Rejected listener on '{channel_name}': {reason} limit reached"
+                    )
+                    return JSONResponse(
+                        status_code=503,
+                        content={"error": "Listener limit reached", "limit": reason},
+                        headers={"Retry-After": str(ADMISSION_RETRY_AFTER)},
+                    )
 
                 q = queue.Queue(maxsize=LISTENER_QUEUE_MAXSIZE)
                 self.streamers[playlist].add_listener(channel_name, q)
@@ -352,30 +563,41 @@ class RadioWebService:
                 except queue.Full:
                     pass
 
+                def disconnect():
+                    ticket.release()
+                    # The host may have switched playlists since, moving this
+                    # queue to another streamer. The channel itself stays mapped
+                    # while its streamer hibernates so returning listeners resume.
+                    for streamer in list(self.streamers.values()):
+                        streamer.remove_listener(channel_name, q)
+
                 def generate():
                     logger.info(f"[Stream] Client connected to {channel_name}")
                     try:
                         yield SILENT_BUFFER
-                        while True:
+                        while not self.draining.is_set():
                             try:
                                 chunk = q.get(timeout=5)
                             except queue.Empty:
                                 chunk = SILENT_BUFFER
                             yield chunk
+                        # Shutting down: send what is already buffered, then end
+                        # the response so the client reconnects.
+                        while True:
+                            try:
+                                yield q.get_nowait()
+                            except queue.Empty:
+                                break
                     finally:
-                        self.streamers[playlist].remove_listener(channel_name, q)
-                        if not self.streamers[playlist].listener_queues.get(
-                            channel_name
-                        ):
-                            logger.info(
-                                f"[Channel] No more listeners on '{channel_name}', removing channel"
-                            )
-                            del self.channels[channel_name]
+                        disconnect()
 
+                # Clean up as soon as the response ends, even if the generator
+                # never started or is only closed later by the GC.
                 return StreamingResponse(
                     generate(),
                     media_type="audio/mpeg",
                     headers={"Cache-Control": "no-cache", "Connection": "keep-alive"},
+                    background=BackgroundTask(disconnect),
                 )
 
             except Exception as e:
@@ -384,23 +606,160 @@ class RadioWebService:
 
 
 # === Signal Handler for Data Reload ===
+def _reload_data():
+    """Reload tracks and playlists and drop state derived from the old catalog."""
+    reload_tracks()
+    reload_playlists()
+    clear_probe_cache()
+    # Replaced files deserve a fresh chance
+    clear_quarantine()
+    rebuild_catalog()
+    if LOUDNESS_ENABLED:
+        start_background_analysis()
+    else:
+        start_duration_backfill()
+
+
 def _handle_sighup(signum, frame):
     """Handle SIGHUP to reload tracks and playlists from source."""
     logger.info("[Signal] Received SIGHUP, reloading tracks and playlists...")
-    reload_tracks()
-    reload_playlists()
+    _reload_data()
 
 
 signal.signal(signal.SIGHUP, _handle_sighup)
 
 
+# === Graceful Shutdown / Hot Restart ===
+class RadioServer(uvicorn.Server):
+    """uvicorn server that drains listeners on exit and completes restart handoff."""
+
+    def __init__(self, config: uvicorn.Config, service: RadioWebService):
+        super().__init__(config)
+        self.service = service
+
+    def handle_exit(self, sig, frame):
+        # Open streams never finish on their own; end them before uvicorn
+        # waits for connections to close.
+        self.service.begin_drain()
+        super().handle_exit(sig, frame)
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets)
+        handoff_pid = os.environ.pop(HANDOFF_PID_ENV, None)
+        if self.should_exit:
+            return
+        if handoff_pid:
+            # Become the unit's main process before the old one exits
+            _sd_notify(f"MAINPID={os.getpid()}\nREADY=1")
+            logger.info(f"[Restart] Serving; asking PID {handoff_pid} to drain")
+            os.kill(int(handoff_pid), signal.SIGTERM)
+        else:
+            _sd_notify("READY=1")
+
+
+def _sd_notify(message: str):
+    """Send a state update to systemd when running as a Type=notify unit."""
+    path = os.environ.get("NOTIFY_SOCKET")
+    if not path:
+        return
+    if path.startswith("@"):
+        path = "\0" + path[1:]  # abstract namespace
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as notify:
+            notify.connect(path)
+            notify.sendall(message.encode())
+    except OSError as e:
+        logger.warning(f"[Systemd] Notify failed: {e}")
+
+
+def _listen_socket() -> socket.socket:
+    """Listening socket inherited from a previous process, or a fresh one."""
+    fd = os.environ.pop(LISTEN_FD_ENV, None)
+    if fd:
+        logger.info(f"[Restart] Inherited listening socket fd {fd}")
+        return socket.socket(fileno=int(fd))
+    return socket.create_server((HOST, PORT))
+
+
+# Set while a replacement process is starting or this one is draining for it;
+# a repeated SIGUSR2 would otherwise spawn a second replacement on the socket.
+_restart_in_progress = False
+
+
+def _hot_restart(service: RadioWebService, sock: socket.socket):
+    """Start a replacement process on the same socket, handing over playback state."""
+    global _restart_in_progress
+    if _restart_in_progress or service.draining.is_set():
+        logger.warning("[Signal] Received SIGUSR2, but a restart or shutdown is already in progress; ignoring")
+        return
+    _restart_in_progress = True
+    logger.info("[Signal] Received SIGUSR2, starting replacement process...")
+    try:
+        tmp_path = f"{RESTART_STATE_PATH}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(service.export_state(), f)
+        os.replace(tmp_path, RESTART_STATE_PATH)
+
+        env = dict(
+            os.environ,
+            **{
+                LISTEN_FD_ENV: str(sock.fileno()),
+                RESTORE_STATE_ENV: RESTART_STATE_PATH,
+                HANDOFF_PID_ENV: str(os.getpid()),
+            },
+        )
+        proc = subprocess.Popen(
+            [sys.executable, *sys.argv],
+            env=env,
+            pass_fds=(sock.fileno(),),
+            start_new_session=True,
+        )
+    except Exception as e:
+        logger.error(f"[Restart] Failed to start replacement process: {e}")
+        _restart_in_progress = False
+        return
+    logger.info(f"[Restart] Replacement process started (PID {proc.pid})")
+
+    def watch_replacement():
+        global _restart_in_progress
+        code = proc.wait()
+        if not service.draining.is_set():
+            # Died before taking over; allow another attempt
+            logger.error(f"[Restart] Replacement process exited with code {code} before handoff")
+            _restart_in_progress = False
+
+    threading.Thread(target=watch_replacement, daemon=True, name="restart-watch").start()
+
+
 # === Main Entrypoint ===
 if __name__ == "__main__":
     # Load tracks and playlists on startup
     logger.info("Loading tracks and playlists...")
     reload_tracks()
     reload_playlists()
+    if LOUDNESS_ENABLED:
+        start_background_analysis()
+    else:
+        start_duration_backfill()
 
     service = RadioWebService()
+
+    state_path = os.environ.pop(RESTORE_STATE_ENV, None)
+    if state_path:
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                service.restore_state(json.load(f))
+        except Exception as e:
+            logger.error(f"[Restart] Failed to restore state: {e}")
+
+    sock = _listen_socket()
+    signal.signal(signal.SIGUSR2, lambda signum, frame: _hot_restart(service, sock))
+
     logger.info(f"Server running at http://{HOST}:{PORT}")
-    uvicorn.run(service.app, host=HOST, port=PORT)
+    server = RadioServer(
+        uvicorn.Config(
+            service.app, timeout_graceful_shutdown=SHUTDOWN_GRACE_SECONDS
+        ),
+        service,
+    )
+    server.run(sockets=[sock])
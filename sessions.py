@@ -0,0 +1,126 @@
+"""Express-compatible session cookies, resolved lazily as a pure ASGI layer."""
+
+import base64
+import hashlib
+import hmac
+import logging
+import urllib.parse
+
+import psycopg2
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import cookie_parser
+
+from config import SESSION_COOKIE_NAME, SESSION_SECRET, SESSION_DB_DSN
+
+logger = logging.getLogger("radio.sessions")
+
+
+def verify_express_cookie(cookie_str: str, secret: str):
+    def base64_to_base64url(s):
+        return s.replace("+", "-").replace("/", "_").rstrip("=")
+
+    cookie_str = urllib.parse.unquote(cookie_str)
+
+    if not cookie_str.startswith("s:") or len(cookie_str) < 3:
+        logger.warning(
+            "[VerifyCookie] Invalid cookie format"
+        )
+        return False, None
+
+    try:
+        value, sig = cookie_str[2:].split(".", 1)
+    except ValueError:
+        logger.warning(
+            "[VerifyCookie] Failed to split cookie into value and signature."
+        )
+        return False, None
+
+    expected_sig = hmac.new(
+        secret.encode(), msg=value.encode(), digestmod=hashlib.sha256
+    ).digest()
+    expected_sig_b64 = base64.urlsafe_b64encode(expected_sig).rstrip(b"=").decode()
+
+    # Convert incoming cookie signature to Base64URL format
+    cookie_sig_urlsafe = base64_to_base64url(sig)
+
+    if hmac.compare_digest(expected_sig_b64, cookie_sig_urlsafe):
+        logger.info("[VerifyCookie] Signature valid")
+        return True, value
+    else:
+        logger.info("[VerifyCookie] Signature mismatch")
+        return False, None
+
+
+def _fetch_session(session_id: str) -> dict | None:
+    try:
+        with psycopg2.connect(SESSION_DB_DSN) as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    "SELECT sess FROM session WHERE sid = %s AND expire > NOW()",
+                    (session_id,),
+                )
+                row = cur.fetchone()
+                if not row:
+                    logger.info("[Session] Session expired or not found")
+                    return None
+                return row[0]
+    except psycopg2.OperationalError as e:
+        logger.warning(f"[Session] DB connection error: {e}")
+    except psycopg2.ProgrammingError as e:
+        logger.error(f"[Session] DB query error: {e}")
+    except Exception as e:
+        logger.error(f"[Session] Unexpected error: {e}", exc_info=True)
+    return None
+
+
+class LazySession:
+    """Session for one request; the cookie check and DB lookup run on first load()."""
+
+    def __init__(self, scope):
+        self._scope = scope
+        self._loaded = False
+        self._data = None
+
+    def _cookie(self) -> str | None:
+        for name, value in self._scope.get("headers", []):
+            if name == b"cookie":
+                return cookie_parser(value.decode("latin-1")).get(SESSION_COOKIE_NAME)
+        return None
+
+    async def load(self) -> dict | None:
+        if self._loaded:
+            return self._data
+        self._loaded = True
+
+        cookie = self._cookie()
+        if not cookie:
+            logger.info("[Session] No session cookie")
+            return None
+
+        valid, session_id = verify_express_cookie(cookie, SESSION_SECRET)
+        if not valid:
+            logger.info("[Session] Invalid signature")
+            return None
+
+        self._data = await run_in_threadpool(_fetch_session, session_id)
+        return self._data
+
+
+class SessionMiddleware:
+    """Attach a LazySession to non-public HTTP requests.
+
+    Pure ASGI: receive/send are passed through untouched, so streaming bodies
+    pay nothing per chunk, and public paths skip the layer entirely.
+    """
+
+    def __init__(self, app, public_paths=(), public_prefixes=()):
+        self.app = app
+        self.public_paths = frozenset(public_paths)
+        self.public_prefixes = tuple(public_prefixes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            path = scope["path"]
+            if path not in self.public_paths and not path.startswith(self.public_prefixes):
+                scope.setdefault("state", {})["session"] = LazySession(scope)
+        await self.app(scope, receive, send)
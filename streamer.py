@@ -2,24 +2,76 @@ import queue
 import time
 import random
 import threading
-import subprocess
 import logging
 
-from config import CHUNK_SIZE, IDLE_TIMEOUT
+from config import (
+    CHUNK_SIZE,
+    IDLE_TIMEOUT,
+    OUTPUT_SAMPLE_RATE,
+    OUTPUT_BITRATE_KBPS,
+    OUTPUT_CHANNELS,
+    PASSTHROUGH_ENABLED,
+    LOUDNESS_ENABLED,
+    LOUDNESS_PASSTHROUGH_TOLERANCE_DB,
+    LOUDNESS_PREFER_PASSTHROUGH,
+    FFMPEG_MAX_RETRIES,
+    FFMPEG_RW_TIMEOUT,
+    HIBERNATION_ENABLED,
+    HIBERNATE_GRACE_SECONDS,
+)
 from tracks import get_track_filename
 from playlists import get_playlist
-from cloudfront import get_signed_url
+from track_sources import get_track_source
+from probe import probe_track, can_passthrough
+from loudness import get_gain_db
+from tracing import SpanRecorder, DurationStats, tracing_enabled
+from supervisor import (
+    FFmpegProcess,
+    backoff_delay,
+    record_success,
+    record_failure,
+    is_quarantined,
+)
 
 logger = logging.getLogger("radio")
 
 
 class AudioStreamer:
-    def __init__(self, playlist_name: str):
+    def __init__(self, playlist_name: str, source=None, resume: dict | None = None):
         self.playlist_name = playlist_name
+        self.source = source or get_track_source()
+        self._resume = resume  # position() snapshot from a previous process
         self.listener_queues = {}  # key: channel_name, value: set of queues
         self.listener_queues_lock = threading.Lock()
         self.command_queue = queue.Queue()
-        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.current_track = None
+        self.track_order = []
+        self.track_index = 0
+        self.track_started_at = None
+        self.plays = {"passthrough": 0, "transcode": 0}
+        # Why transcoded plays weren't passed through
+        self.transcode_reasons = {"disabled": 0, "format": 0, "gain": 0}
+        self.dropped_chunks = 0  # chunks skipped for listeners whose queue was full
+        self.ffmpeg_failures = 0
+        self.transient_failures = 0  # consecutive spawn/network failures, shared by all tracks
+        self.encode_speed = None  # realtime factor reported by the current ffmpeg
+        self._last_listener_time = time.time()
+        self.keep_warm = False  # set by the pre-warm schedule; never hibernate or exit
+        self.playing = False  # ffmpeg is running and feeding listeners
+        self.hibernating_since = None
+        self.hibernated_seconds = 0.0  # completed hibernations only; see hibernated_total()
+        self.hibernations = 0
+        self._paused_offset = 0.0  # position in the current track while ffmpeg isn't running
+        self.ffmpeg_cpu_seconds = 0.0
+        self.ffmpeg_audio_seconds = 0.0
+        self.cold_start_ms = None  # first listener to first audio byte
+        self.wake_latency = DurationStats()  # later listener-triggered wakes
+        self._wake_requested_at = None
+        self._ever_played = False
+        self.spans = SpanRecorder()
+        self.thread = threading.Thread(
+            target=self._run, daemon=True, name=f"streamer:{playlist_name}"
+        )
 
     def start(self):
         if not self.thread.is_alive():
@@ -30,6 +82,10 @@ class AudioStreamer:
             if channel_name not in self.listener_queues:
                 self.listener_queues[channel_name] = set()
             self.listener_queues[channel_name].add(q)
+        if not self.playing:
+            if self._wake_requested_at is None:
+                self._wake_requested_at = time.time()
+            self.put_command("wake")
 
     def remove_listener(self, channel_name, q):
         with self.listener_queues_lock:
@@ -41,8 +97,151 @@ class AudioStreamer:
     def put_command(self, cmd: str):
         self.command_queue.put(cmd)
 
+    def stop(self, timeout: float = 5.0):
+        """Stop the streamer thread and wait for its ffmpeg child to be reaped."""
+        self.put_command("stop")
+        if self.thread.is_alive():
+            self.thread.join(timeout)
+
+    def position(self) -> dict:
+        """Snapshot of the playback position, used to resume in another process."""
+        paused = self.hibernating_since is not None
+        if self.track_started_at is None:
+            offset = self._paused_offset
+        else:
+            offset = time.time() - self.track_started_at
+        return {
+            "playlist": self.playlist_name,
+            "order": list(self.track_order),
+            "index": self.track_index,
+            "offset": round(offset, 3),
+            "paused": paused,
+            "snapshot_at": time.time(),
+        }
+
+    def _hold_position(self, offset: float):
+        """Report `offset` into the current track until ffmpeg starts playing it."""
+        self.track_started_at = None
+        self._paused_offset = offset
+
+    def _apply_resume(self, tracks: list[tuple[str, str]]):
+        """Reorder tracks to match the resumed play order.
+
+        Returns (tracks, start_index, start_offset).
+        """
+        resume = self._resume
+        self._resume = None
+        by_key = dict(tracks)
+        order = [k for k in resume.get("order", []) if k in by_key]
+        order += [k for k in by_key if k not in order]
+        resumed = [(k, by_key[k]) for k in order]
+
+        old_order = resume.get("order", [])
+        index = resume.get("index", 0)
+        current = old_order[index] if 0 <= index < len(old_order) else None
+        if current not in by_key:
+            return resumed, 0, 0.0
+
+        offset = resume.get("offset", 0.0)
+        if not resume.get("paused"):
+            # The old process kept playing while this one started up
+            offset += time.time() - resume.get("snapshot_at", time.time())
+        return resumed, order.index(current), max(0.0, offset)
+
+    def hibernated_total(self) -> float:
+        """Seconds spent hibernating, including the current hibernation."""
+        since = self.hibernating_since
+        total = self.hibernated_seconds
+        if since is not None:
+            total += time.time() - since
+        return total
+
+    def cpu_seconds_saved(self) -> float:
+        """Estimated ffmpeg CPU avoided by hibernating, at this streamer's measured rate."""
+        if not self.ffmpeg_audio_seconds:
+            return 0.0
+        return self.hibernated_total() * self.ffmpeg_cpu_seconds / self.ffmpeg_audio_seconds
+
+    def stats(self) -> dict:
+        with self.listener_queues_lock:
+            listeners = sum(len(qs) for qs in self.listener_queues.values())
+        total_plays = sum(self.plays.values())
+        if self.hibernating_since is not None:
+            state = "hibernating"
+        else:
+            state = "playing" if self.playing else "starting"
+        return {
+            "playlist": self.playlist_name,
+            "alive": self.thread.is_alive(),
+            "state": state,
+            "keep_warm": self.keep_warm,
+            "current_track": self.current_track,
+            "listeners": listeners,
+            "plays": dict(self.plays),
+            "transcode_reasons": dict(self.transcode_reasons),
+            "dropped_chunks": self.dropped_chunks,
+            "ffmpeg_failures": self.ffmpeg_failures,
+            "transient_failures": self.transient_failures,
+            "encode_speed": self.encode_speed,
+            "hibernations": self.hibernations,
+            "hibernated_seconds": round(self.hibernated_total(), 1),
+            "cpu_seconds_saved_est": round(self.cpu_seconds_saved(), 2),
+            "cold_start_ms": self.cold_start_ms,
+            "wake_latency": self.wake_latency.as_attrs(),
+            "passthrough_pct": (
+                round(100 * self.plays["passthrough"] / total_plays, 1)
+                if total_plays
+                else 0.0
+            ),
+        }
+
+    @staticmethod
+    def _ffmpeg_args(
+        track_input: str, passthrough: bool, gain_db: float = 0.0, offset: float = 0.0
+    ) -> list[str]:
+        if passthrough:
+            codec_args = ["-c:a", "copy"]
+        else:
+            codec_args = []
+            if gain_db:
+                audio_filter = f"volume={gain_db:.2f}dB"
+                if gain_db > 0:
+                    # Keep boosted peaks under -1 dBFS
+                    audio_filter += ",alimiter=limit=0.891:level=false"
+                codec_args += ["-af", audio_filter]
+            codec_args += [
+                "-acodec",
+                "libmp3lame",
+                "-ar",
+                str(OUTPUT_SAMPLE_RATE),
+                "-ac",
+                str(OUTPUT_CHANNELS),
+                "-b:a",
+                f"{OUTPUT_BITRATE_KBPS}k",
+            ]
+        return [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-nostats",
+            "-progress",
+            "pipe:2",
+            "-re",
+            *(["-ss", f"{offset:.3f}"] if offset > 0 else []),
+            # A stalled CloudFront read would otherwise block the pump forever
+            *(["-rw_timeout", str(int(FFMPEG_RW_TIMEOUT * 1_000_000))] if "://" in track_input else []),
+            "-i",
+            track_input,
+            "-vn",
+            *codec_args,
+            "-f",
+            "mp3",
+            "-",
+        ]
+
     def _run(self):
-        last_listener_time = time.time()
+        self._last_listener_time = time.time()
         while True:
             track_keys = get_playlist(self.playlist_name)
             if not track_keys:
@@ -52,12 +251,13 @@ class AudioStreamer:
 
             # Resolve track keys to filenames, skip any that don't exist
             tracks = []
-            for key in track_keys:
-                filename = get_track_filename(key)
-                if filename:
-                    tracks.append((key, filename))
-                else:
-                    logger.warning(f"[!] Track key '{key}' not found in registry.")
+            with self.spans.span("resolve_keys", keys=len(track_keys)):
+                for key in track_keys:
+                    filename = get_track_filename(key)
+                    if filename:
+                        tracks.append((key, filename))
+                    else:
+                        logger.warning(f"[!] Track key '{key}' not found in registry.")
 
             if not tracks:
                 logger.warning("[!] No valid tracks found. Waiting...")
@@ -65,84 +265,374 @@ class AudioStreamer:
                 continue
 
             random.shuffle(tracks)
+            start_index, start_offset = 0, 0.0
+            if self._resume:
+                tracks, start_index, start_offset = self._apply_resume(tracks)
+                logger.info(
+                    f"[Streamer] Resuming '{self.playlist_name}' at track {start_index} +{start_offset:.1f}s"
+                )
+            self.track_order = [key for key, _ in tracks]
 
-            for track_key, track_filename in tracks:
-                # Generate signed CloudFront URL for this track
-                track_url = get_signed_url(track_filename)
-                logger.info(f"Now playing: {track_key} ({track_filename})")
-
-                try:
-                    proc = subprocess.Popen(
-                        [
-                            "ffmpeg",
-                            "-hide_banner",
-                            "-loglevel",
-                            "quiet",
-                            "-re",
-                            "-i",
-                            track_url,
-                            "-vn",
-                            "-acodec",
-                            "libmp3lame",
-                            "-ar",
-                            "44100",
-                            "-b:a",
-                            "128k",
-                            "-f",
-                            "mp3",
-                            "-",
-                        ],
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.PIPE,
-                    )
-                except FileNotFoundError:
-                    logger.error("FFmpeg not found in PATH")
-                    time.sleep(5)
+            played = 0
+            for index in range(start_index, len(tracks)):
+                track_key, track_filename = tracks[index]
+                offset = start_offset if index == start_index else 0.0
+                self.track_index = index
+                self._hold_position(offset)
+                if is_quarantined(track_filename):
+                    logger.warning(f"[Streamer] Skipping quarantined track '{track_key}'.")
                     continue
-                except Exception as e:
-                    logger.error(f"Failed to start FFmpeg: {e}")
-                    time.sleep(5)
+                # Resolve the ffmpeg input (signed URL or local path) for this track
+                source = self.source.source_for(track_filename)
+                if source is None:
+                    logger.warning(
+                        f"[!] Track '{track_key}' ({track_filename}) not available from {self.source.name} source."
+                    )
                     continue
+                if self._play_track(track_key, track_filename, source, offset) == "exit":
+                    return
+                played += 1
+
+            if not played:
+                logger.warning(f"[!] No playable tracks in '{self.playlist_name}'. Waiting...")
+                time.sleep(5)
+
+    def _play_track(self, track_key: str, track_filename: str, source, offset: float) -> str:
+        """Play one track, restarting ffmpeg from where it stopped if it fails.
+
+        Returns "exit" if the streamer should stop, otherwise "done".
+        """
+        self.current_track = track_key
+        # An idle streamer shouldn't sign or probe a track nobody will hear yet;
+        # the URL could expire before a listener wakes it.
+        if self._should_hibernate():
+            state = self._hibernate(track_key, offset)
+            if state == "exit":
+                return "exit"
+            if state == "next":
+                return "done"
 
+        with self.spans.span("sign_url", track=track_key, source=source.name):
+            track_input = source.get_input(track_filename)
+        with self.spans.span("probe", track=track_key):
+            info = probe_track(track_filename, track_input)
+        gain_db = get_gain_db(track_filename) if LOUDNESS_ENABLED else 0.0
+        if not PASSTHROUGH_ENABLED:
+            reason = "disabled"
+        elif not can_passthrough(info):
+            reason = "format"
+        elif LOUDNESS_PREFER_PASSTHROUGH or abs(gain_db) <= LOUDNESS_PASSTHROUGH_TOLERANCE_DB:
+            # Either normalization only applies to tracks transcoded anyway, or
+            # the gain is too small to be worth a re-encode
+            reason = None
+        else:
+            reason = "gain"
+        passthrough = reason is None
+        if passthrough:
+            gain_db = 0.0
+        else:
+            self.transcode_reasons[reason] += 1
+        mode = "passthrough" if passthrough else "transcode"
+        logger.info(
+            f"Now playing: {track_key} ({track_filename}) via {source.name} "
+            f"[{mode}, gain {gain_db:+.1f} dB]"
+        )
+        self.plays[mode] += 1
+        duration = info.get("duration") if info else None
+        duration_estimated = bool(info and info.get("duration_estimated"))
+
+        attempt = 0  # failures of this play blamed on the track
+        stuck = 0  # consecutive other failures of this play that produced no audio
+        retry_delay = None
+        while True:
+            resign = False
+            if retry_delay is not None:
+                cmd = self._wait_for_command(retry_delay)
+                if cmd == "stop":
+                    logger.info("[Streamer] Stopped.")
+                    return "exit"
+                if cmd == "next":
+                    return "done"
+                # Signed URLs can expire or hit a bad edge
+                resign = True
+                retry_delay = None
+
+            if self._should_hibernate():
+                state = self._hibernate(track_key, offset)
+                if state == "exit":
+                    return "exit"
+                if state == "next":
+                    return "done"
+                resign = True
+
+            if resign:
+                with self.spans.span("sign_url", track=track_key, source=source.name, attempt=attempt):
+                    track_input = source.get_input(track_filename)
+
+            proc = None
+            try:
+                with self.spans.span("spawn_ffmpeg", track=track_key, mode=mode):
+                    proc = FFmpegProcess(
+                        self._ffmpeg_args(track_input, passthrough, gain_db, offset),
+                        label=track_key,
+                    )
+            except FileNotFoundError:
+                logger.error("FFmpeg not found in PATH")
+                outcome = "failed"
+            except Exception as e:
+                logger.error(f"Failed to start FFmpeg: {e}")
+                outcome = "failed"
+            else:
+                self.track_started_at = time.time() - offset
                 try:
-                    while True:
-                        try:
-                            cmd = self.command_queue.get_nowait()
-                            if cmd == "stop":
-                                logger.info("[Streamer] Stopped.")
-                                return
-                            elif cmd == "next":
-                                logger.info("[Streamer] Skipping track.")
-                                break
-                            # Removed "change" command - playlist changes handled via Channel.play_playlist()
-                        except queue.Empty:
-                            pass
-
-                        assert proc.stdout is not None
-                        chunk = proc.stdout.read(CHUNK_SIZE)
-                        if chunk:
-                            with self.listener_queues_lock:
-                                if any(self.listener_queues.values()):
-                                    last_listener_time = time.time()
-                                for listeners in list(self.listener_queues.values()):
-                                    for q in listeners:
-                                        try:
-                                            q.put_nowait(chunk)
-                                        except queue.Full:
-                                            pass
-                        else:
-                            logger.info("[Streamer] End of track reached.")
-                            break
-
-                        if time.time() - last_listener_time > IDLE_TIMEOUT:
-                            logger.info(
-                                f"[Streamer] No listeners for {IDLE_TIMEOUT} seconds. Exiting."
-                            )
-                            return
+                    outcome = self._pump(proc, track_key)
+                    if outcome == "eof":
+                        remaining = duration - offset if duration else None
+                        outcome = proc.finish(remaining, duration_estimated)
                 finally:
                     # Ensure FFmpeg process is properly cleaned up
-                    if proc.poll() is None:
-                        proc.kill()
-                    if proc.stdout:
-                        proc.stdout.close()
-                    proc.wait()
+                    with self.spans.span("teardown", track=track_key):
+                        proc.close()
+                    if proc.cpu_time is not None:
+                        self.ffmpeg_cpu_seconds += proc.cpu_time
+                        self.ffmpeg_audio_seconds += proc.out_time
+
+            if outcome == "exit":
+                return "exit"
+            if outcome == "next":
+                return "done"
+            if outcome == "eof":
+                logger.info("[Streamer] End of track reached.")
+                record_success(track_filename)
+                self.transient_failures = 0
+                return "done"
+            if outcome == "hibernate":
+                # Pick up where the listeners left off
+                offset += proc.out_time
+                self._hold_position(offset)
+                attempt = 0
+                stuck = 0
+                continue
+
+            # Failed: resume from the last position ffmpeg reported
+            self.ffmpeg_failures += 1
+            if proc is not None:
+                offset += proc.out_time
+            self._hold_position(offset)
+            if proc is not None and proc.failure_kind == "track":
+                attempt += 1
+                if attempt > FFMPEG_MAX_RETRIES:
+                    if record_failure(track_filename):
+                        logger.error(f"[Streamer] Quarantined track '{track_key}' after repeated failures.")
+                    else:
+                        logger.error(f"[Streamer] Giving up on track '{track_key}'.")
+                    return "done"
+                retry_delay = backoff_delay(attempt)
+                logger.warning(
+                    f"[Streamer] Retrying '{track_key}' from {offset:.1f}s in {retry_delay:.1f}s "
+                    f"(attempt {attempt}/{FFMPEG_MAX_RETRIES})"
+                )
+            else:
+                # Spawn or network trouble isn't the track's fault (an upstream
+                # outage would otherwise quarantine the whole catalog): back off
+                # across the streamer and keep retrying, never quarantine.
+                if proc is not None and proc.out_time > 0:
+                    self.transient_failures = 0
+                    stuck = 0
+                else:
+                    stuck += 1
+                self.transient_failures += 1
+                if stuck > FFMPEG_MAX_RETRIES:
+                    # A failure ffmpeg repeats without playing anything (a
+                    # persistent 5xx, an unsupported codec or filter) would
+                    # otherwise hold the channel on this track forever. The
+                    # streamer-wide backoff carries over to the next track.
+                    logger.error(
+                        f"[Streamer] FFmpeg failed {stuck} times on '{track_key}' without "
+                        f"producing audio; skipping it."
+                    )
+                    return "done"
+                retry_delay = backoff_delay(self.transient_failures)
+                logger.warning(
+                    f"[Streamer] FFmpeg failed without a track error; retrying '{track_key}' "
+                    f"from {offset:.1f}s in {retry_delay:.1f}s"
+                )
+
+    def _should_hibernate(self) -> bool:
+        if not HIBERNATION_ENABLED or self.keep_warm:
+            return False
+        with self.listener_queues_lock:
+            if any(self.listener_queues.values()):
+                return False
+        return time.time() - self._last_listener_time >= HIBERNATE_GRACE_SECONDS
+
+    def _hibernate(self, track_key: str, offset: float) -> str:
+        """Wait without ffmpeg until a listener arrives.
+
+        Returns "wake", "next" or "exit" (stop command or idle timeout).
+        """
+        self.playing = False
+        self._hold_position(offset)
+        self.hibernating_since = time.time()
+        self.hibernations += 1
+        logger.info(
+            f"[Streamer] No listeners on '{self.playlist_name}', hibernating at {track_key} +{offset:.1f}s"
+        )
+        try:
+            while True:
+                if self.keep_warm:
+                    return "wake"
+                with self.listener_queues_lock:
+                    if any(self.listener_queues.values()):
+                        return "wake"
+                remaining = IDLE_TIMEOUT - (time.time() - self._last_listener_time)
+                if remaining <= 0:
+                    logger.info(
+                        f"[Streamer] No listeners for {IDLE_TIMEOUT} seconds. Exiting."
+                    )
+                    return "exit"
+                try:
+                    cmd = self.command_queue.get(timeout=remaining)
+                except queue.Empty:
+                    continue
+                if cmd == "stop":
+                    logger.info("[Streamer] Stopped.")
+                    return "exit"
+                if cmd == "next":
+                    logger.info("[Streamer] Skipping track.")
+                    return "next"
+                # "wake" (a listener joined) falls through to the checks above
+        finally:
+            self.hibernated_seconds += time.time() - self.hibernating_since
+            self.hibernating_since = None
+
+    def _mark_playing(self):
+        """Record how long the listener that woke this streamer waited for audio."""
+        self.playing = True
+        requested = self._wake_requested_at
+        self._wake_requested_at = None
+        if requested is not None:
+            latency = time.time() - requested
+            if not self._ever_played:
+                self.cold_start_ms = round(latency * 1000, 1)
+            else:
+                self.wake_latency.add(latency)
+        self._ever_played = True
+
+    def _wait_for_command(self, timeout: float) -> str | None:
+        """Sleep up to `timeout` seconds, returning early with any stop/next command."""
+        deadline = time.time() + timeout
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            try:
+                cmd = self.command_queue.get(timeout=remaining)
+            except queue.Empty:
+                return None
+            if cmd in ("stop", "next"):
+                return cmd
+
+    def _pump(self, proc: FFmpegProcess, track_key: str) -> str:
+        """Fan ffmpeg output out to listeners until EOF or a command.
+
+        Returns "eof", "next", "hibernate" or "exit" (stop command or idle timeout).
+        """
+        # Sampled once per track so the per-chunk cost when off is a bool test
+        tracing = tracing_enabled()
+        spawned_at = time.perf_counter()
+        spawned_wall = time.time()
+        first_byte = True
+        read_stats = DurationStats()
+        lock_stats = DurationStats()
+        try:
+            while True:
+                try:
+                    cmd = self.command_queue.get_nowait()
+                    if cmd == "stop":
+                        logger.info("[Streamer] Stopped.")
+                        return "exit"
+                    elif cmd == "next":
+                        logger.info("[Streamer] Skipping track.")
+                        return "next"
+                    # Removed "change" command - playlist changes handled via Channel.play_playlist()
+                except queue.Empty:
+                    pass
+
+                assert proc.stdout is not None
+                if tracing:
+                    read_started = time.perf_counter()
+                chunk = proc.stdout.read(CHUNK_SIZE)
+                if tracing:
+                    read_done = time.perf_counter()
+                    if first_byte:
+                        self.spans.record(
+                            "first_byte",
+                            spawned_wall,
+                            read_done - spawned_at,
+                            track=track_key,
+                        )
+                        first_byte = False
+                    else:
+                        read_stats.add(read_done - read_started)
+                self.encode_speed = proc.speed
+                if chunk:
+                    if tracing:
+                        lock_started = time.perf_counter()
+                    with self.listener_queues_lock:
+                        if tracing:
+                            lock_stats.add(time.perf_counter() - lock_started)
+                        listening = any(self.listener_queues.values())
+                        if listening:
+                            self._last_listener_time = time.time()
+                        for listeners in list(self.listener_queues.values()):
+                            for q in listeners:
+                                try:
+                                    q.put_nowait(chunk)
+                                except queue.Full:
+                                    self.dropped_chunks += 1
+                else:
+                    return "eof"
+
+                if not self.playing:
+                    self._mark_playing()
+                if self.keep_warm:
+                    self._last_listener_time = time.time()
+                elif HIBERNATION_ENABLED:
+                    if not listening and time.time() - self._last_listener_time >= HIBERNATE_GRACE_SECONDS:
+                        return "hibernate"
+                elif time.time() - self._last_listener_time > IDLE_TIMEOUT:
+                    logger.info(
+                        f"[Streamer] No listeners for {IDLE_TIMEOUT} seconds. Exiting."
+                    )
+                    return "exit"
+        finally:
+            if tracing:
+                self.spans.record(
+                    "steady_read",
+                    spawned_wall,
+                    read_stats.total,
+                    track=track_key,
+                    **read_stats.as_attrs(),
+                )
+                self.spans.record(
+                    "fanout_lock_wait",
+                    spawned_wall,
+                    lock_stats.total,
+                    track=track_key,
+                    **lock_stats.as_attrs(),
+                )
+
+
+_ensure_lock = threading.Lock()
+
+
+def ensure_streamer(streamers: dict, playlist_name: str) -> AudioStreamer:
+    """Return the running streamer for a playlist, starting a new one if needed."""
+    with _ensure_lock:
+        streamer = streamers.get(playlist_name)
+        if streamer is None or not streamer.thread.is_alive():
+            streamer = AudioStreamer(playlist_name=playlist_name)
+            streamers[playlist_name] = streamer
+            streamer.start()
+        return streamer
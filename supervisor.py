@@ -0,0 +1,219 @@
+"""ffmpeg process supervision: stderr/progress parsing, exit classification,
+retry backoff and quarantine of tracks that keep failing."""
+
+import collections
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+
+from config import (
+    FFMPEG_RETRY_BASE_DELAY,
+    FFMPEG_RETRY_MAX_DELAY,
+    FFMPEG_MIN_SPEED,
+    QUARANTINE_AFTER_FAILURES,
+    QUARANTINE_SECONDS,
+)
+
+logger = logging.getLogger("radio.supervisor")
+
+# A run that logged track errors and ended this fraction short of the probed
+# duration was cut short
+_TRUNCATION_TOLERANCE = 0.05
+
+# stderr lines that blame the track itself (bad data, missing or refused file)
+# rather than the network or this host; only these count toward quarantine
+_TRACK_ERROR_PATTERN = re.compile(
+    r"Invalid data found|Header missing|[Ee]rror while decoding|"
+    r"Server returned 4\d\d|HTTP error 4\d\d|No such file or directory"
+)
+
+# Consecutive slow progress reports (~0.5s apart) before warning
+_SLOW_REPORTS_BEFORE_WARNING = 6
+
+try:
+    _CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    _CLOCK_TICKS = 100
+
+
+class FFmpegProcess:
+    """A running ffmpeg whose stderr is drained and parsed on a background thread.
+
+    Expects ffmpeg to be started with `-progress pipe:2` so progress
+    key=value lines arrive on stderr alongside error messages.
+    """
+
+    def __init__(self, args: list[str], label: str = ""):
+        self.label = label
+        self.speed = None  # realtime factor from the last progress report
+        self.min_speed = None
+        self.out_time = 0.0  # seconds of audio written so far
+        self.errors = collections.deque(maxlen=20)
+        self.track_errors = 0
+        self.progress_end = False
+        self.cpu_time = None  # ffmpeg's user+system CPU seconds, sampled when it ends
+        self._slow_reports = 0
+        self._warned_slow = False
+
+        self.proc = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._stderr_thread = threading.Thread(
+            target=self._drain_stderr, daemon=True, name=f"ffmpeg-stderr:{label}"
+        )
+        self._stderr_thread.start()
+
+    @property
+    def stdout(self):
+        return self.proc.stdout
+
+    def _drain_stderr(self):
+        assert self.proc.stderr is not None
+        for raw in self.proc.stderr:
+            line = raw.decode("utf-8", "replace").strip()
+            if not line:
+                continue
+            key, sep, value = line.partition("=")
+            if sep and " " not in key:
+                self._progress(key, value)
+            else:
+                self.errors.append(line)
+                if _TRACK_ERROR_PATTERN.search(line):
+                    self.track_errors += 1
+                logger.warning(f"[FFmpeg] {self.label}: {line}")
+
+    @property
+    def failure_kind(self) -> str:
+        """"track" if a failed run logged errors about the track itself, else "transient"."""
+        return "track" if self.track_errors else "transient"
+
+    def _progress(self, key: str, value: str):
+        if key == "out_time_us" or (key == "out_time_ms" and not self.out_time):
+            # out_time_ms is also in microseconds (long-standing ffmpeg quirk)
+            try:
+                self.out_time = int(value) / 1_000_000
+            except ValueError:
+                pass
+        elif key == "speed":
+            try:
+                speed = float(value.rstrip("x"))
+            except ValueError:
+                return
+            self.speed = speed
+            self.min_speed = speed if self.min_speed is None else min(self.min_speed, speed)
+            self._check_speed(speed)
+        elif key == "progress" and value == "end":
+            self.progress_end = True
+
+    def _check_speed(self, speed: float):
+        if speed >= FFMPEG_MIN_SPEED:
+            self._slow_reports = 0
+            return
+        self._slow_reports += 1
+        if self._slow_reports >= _SLOW_REPORTS_BEFORE_WARNING and not self._warned_slow:
+            self._warned_slow = True
+            logger.warning(
+                f"[FFmpeg] {self.label}: encoding below realtime ({speed:.2f}x), possible CPU starvation"
+            )
+
+    def _sample_cpu_time(self):
+        """Read CPU time from /proc while the process (or its zombie) is unreaped."""
+        if self.cpu_time is not None:
+            return
+        try:
+            with open(f"/proc/{self.proc.pid}/stat", "rb") as f:
+                fields = f.read().rsplit(b")", 1)[1].split()
+            # utime and stime are fields 14 and 15; the split starts at field 3
+            self.cpu_time = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS
+        except (OSError, IndexError, ValueError):
+            pass
+
+    def finish(
+        self, expected_seconds: float | None = None, estimated: bool = False, timeout: float = 5.0
+    ) -> str:
+        """After stdout EOF, classify the run as "eof" (track complete) or "failed".
+
+        A clean exit only counts as truncated if ffmpeg also reported track
+        errors and the duration is exact (not estimated from the bitrate).
+        """
+        self._sample_cpu_time()
+        try:
+            returncode = self.proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            return "failed"
+        self._stderr_thread.join(timeout)
+
+        if returncode != 0:
+            logger.warning(f"[FFmpeg] {self.label}: exited with code {returncode}")
+            return "failed"
+        if not self.track_errors or not expected_seconds or estimated:
+            return "eof"
+        if self.out_time < expected_seconds * (1 - _TRUNCATION_TOLERANCE):
+            logger.warning(
+                f"[FFmpeg] {self.label}: ended at {self.out_time:.1f}s of {expected_seconds:.1f}s"
+            )
+            return "failed"
+        return "eof"
+
+    def close(self):
+        """Kill if still running and reap the process."""
+        if self.proc.returncode is None:
+            self._sample_cpu_time()
+        if self.proc.poll() is None:
+            self.proc.kill()
+        if self.proc.stdout:
+            self.proc.stdout.close()
+        self.proc.wait()
+        self._stderr_thread.join(1.0)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential delay before retry number `attempt` (1-based)."""
+    return min(FFMPEG_RETRY_MAX_DELAY, FFMPEG_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+
+
+# Quarantine registry: File Name -> consecutive failed plays / quarantined-until timestamp
+_failures: dict[str, int] = {}
+_quarantine: dict[str, float] = {}
+_quarantine_lock = threading.Lock()
+
+
+def record_success(filename: str):
+    with _quarantine_lock:
+        _failures.pop(filename, None)
+
+
+def record_failure(filename: str) -> bool:
+    """Count a play that failed after all retries. Returns True if now quarantined."""
+    with _quarantine_lock:
+        _failures[filename] = _failures.get(filename, 0) + 1
+        if _failures[filename] >= QUARANTINE_AFTER_FAILURES:
+            _quarantine[filename] = time.time() + QUARANTINE_SECONDS
+            _failures.pop(filename, None)
+            return True
+    return False
+
+
+def is_quarantined(filename: str) -> bool:
+    with _quarantine_lock:
+        until = _quarantine.get(filename)
+        if until is None:
+            return False
+        if until <= time.time():
+            del _quarantine[filename]
+            return False
+        return True
+
+
+def quarantined_tracks() -> dict[str, float]:
+    """Quarantined file names and the time their quarantine ends."""
+    now = time.time()
+    with _quarantine_lock:
+        return {name: until for name, until in _quarantine.items() if until > now}
+
+
+def clear_quarantine():
+    with _quarantine_lock:
+        _failures.clear()
+        _quarantine.clear()
@@ -0,0 +1,185 @@
+"""Timing spans for the streamer track lifecycle and an on-demand sampling profiler.
+
+Tracing is off by default and can be toggled at runtime. When off, span()
+returns a shared no-op context manager and the per-chunk hot path only tests
+a local bool.
+"""
+
+import collections
+import sys
+import threading
+import time
+
+from config import TRACING_ENABLED, TRACE_SPANS_PER_STREAMER, PROFILER_MAX_SECONDS
+
+_enabled = TRACING_ENABLED
+
+
+def set_tracing(enabled: bool):
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def tracing_enabled() -> bool:
+    return _enabled
+
+
+class _NoopSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("recorder", "name", "attrs", "start", "_t0")
+
+    def __init__(self, recorder: "SpanRecorder", name: str, attrs: dict):
+        self.recorder = recorder
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.recorder.record(self.name, self.start, time.perf_counter() - self._t0, **self.attrs)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class SpanRecorder:
+    """Ring buffer of the most recent spans for one streamer."""
+
+    def __init__(self, maxlen: int = TRACE_SPANS_PER_STREAMER):
+        self._spans = collections.deque(maxlen=maxlen)
+
+    def span(self, name: str, **attrs):
+        return _Span(self, name, attrs) if _enabled else _NOOP_SPAN
+
+    def record(self, name: str, start: float, duration: float, **attrs):
+        if _enabled:
+            self._spans.append(
+                {"name": name, "start": round(start, 3), "duration_ms": round(duration * 1000, 3), **attrs}
+            )
+
+    def recent(self, limit: int | None = None) -> list[dict]:
+        spans = list(self._spans)
+        return spans[-limit:] if limit else spans
+
+
+class DurationStats:
+    """Count/total/max of repeated timings, summarized into a single span."""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_attrs(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(1000 * self.total / self.count, 3) if self.count else 0.0,
+            "max_ms": round(1000 * self.max, 3),
+        }
+
+
+class SamplingProfiler:
+    """Periodically samples every thread's stack and counts identical stacks."""
+
+    MAX_DEPTH = 20
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stacks = collections.Counter()
+        self._samples = 0
+        self._thread = None
+        self._stop = threading.Event()
+        self.interval = 0.01
+        self.started_at = None
+        self.stopped_at = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01, max_seconds: float = PROFILER_MAX_SECONDS):
+        if self.running:
+            return
+        with self._lock:
+            self._stacks.clear()
+            self._samples = 0
+        self.interval = interval
+        self.started_at = time.time()
+        self.stopped_at = None
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(max_seconds,), daemon=True, name="sampling-profiler"
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _collapse(self, frame) -> str:
+        """Outermost-first "func (file:line);..." without touching source files."""
+        parts = []
+        while frame is not None and len(parts) < self.MAX_DEPTH:
+            code = frame.f_code
+            parts.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(parts))
+
+    def _run(self, max_seconds: float):
+        own_id = threading.get_ident()
+        deadline = time.time() + max_seconds
+        while not self._stop.wait(self.interval) and time.time() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            sampled = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                sampled.append(f"{names.get(thread_id, thread_id)};{self._collapse(frame)}")
+            with self._lock:
+                self._samples += 1
+                self._stacks.update(sampled)
+        self.stopped_at = time.time()
+
+    def report(self, top: int = 30) -> dict:
+        with self._lock:
+            stacks = self._stacks.most_common(top)
+            samples = self._samples
+        return {
+            "running": self.running,
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+            "interval_ms": round(self.interval * 1000, 1),
+            "samples": samples,
+            "stacks": [{"stack": stack, "count": count} for stack, count in stacks],
+        }
+
+
+profiler = SamplingProfiler()
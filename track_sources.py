@@ -0,0 +1,95 @@
+"""Track sources: where ffmpeg reads a track's audio from.
+
+- cloudfront: signed CloudFront URL (default)
+- local: file under MUSIC_BASE_DIR, read directly by ffmpeg
+- auto: local file when present, otherwise CloudFront
+"""
+
+import logging
+import os
+
+from config import MUSIC_BASE_DIR, TRACK_SOURCE
+
+logger = logging.getLogger("radio.sources")
+
+
+class CloudFrontSource:
+    name = "cloudfront"
+
+    def source_for(self, filename: str):
+        return self
+
+    def signature(self, filename: str) -> str:
+        # CloudFront files are replaced under new names, so the name is enough
+        return ""
+
+    def get_input(self, filename: str) -> str:
+        # Imported lazily so local-only deployments don't need CloudFront keys
+        from cloudfront import get_signed_url
+
+        return get_signed_url(filename)
+
+
+class LocalSource:
+    name = "local"
+
+    def __init__(self, base_dir: str = MUSIC_BASE_DIR):
+        self.base_dir = os.path.abspath(base_dir)
+
+    def _path(self, filename: str) -> str | None:
+        path = os.path.abspath(os.path.join(self.base_dir, filename))
+        if os.path.commonpath([self.base_dir, path]) != self.base_dir:
+            logger.warning(f"[Source] Refusing path outside MUSIC_BASE_DIR: {filename}")
+            return None
+        return path
+
+    def source_for(self, filename: str):
+        path = self._path(filename)
+        if path and os.path.isfile(path):
+            return self
+        return None
+
+    def signature(self, filename: str) -> str:
+        """Size and mtime, used to detect changed files."""
+        st = os.stat(self.get_input(filename))
+        return f"{st.st_size}:{int(st.st_mtime)}"
+
+    def get_input(self, filename: str) -> str:
+        path = self._path(filename)
+        if path is None:
+            raise ValueError(f"Invalid track filename: {filename}")
+        return path
+
+
+class AutoSource:
+    name = "auto"
+
+    def __init__(self, local: LocalSource | None = None, remote: CloudFrontSource | None = None):
+        self.local = local or LocalSource()
+        self.remote = remote or CloudFrontSource()
+
+    def source_for(self, filename: str):
+        return self.local.source_for(filename) or self.remote
+
+    def signature(self, filename: str) -> str:
+        return self.source_for(filename).signature(filename)
+
+    def get_input(self, filename: str) -> str:
+        return self.source_for(filename).get_input(filename)
+
+
+_SOURCES = {
+    "cloudfront": CloudFrontSource,
+    "local": LocalSource,
+    "auto": AutoSource,
+}
+
+
+def get_track_source(name: str = TRACK_SOURCE):
+    """Build the track source configured by TRACK_SOURCE."""
+    try:
+        return _SOURCES[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown TRACK_SOURCE '{name}', expected one of: {', '.join(_SOURCES)}"
+        )
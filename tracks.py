@@ -1,6 +1,9 @@
+import json
 import logging
+import os
+import threading
 import urllib.error
-from config import TRACKS_CSV_PATH
+from config import TRACKS_CSV_PATH, LOUDNESS_CACHE_PATH
 from sheets_utils import read_csv
 
 logger = logging.getLogger("radio.tracks")
@@ -8,6 +11,12 @@ logger = logging.getLogger("radio.tracks")
 # Track registry: KEY TITLE -> File Name
 _tracks: dict[str, str] = {}
 
+# Loudness registry: File Name -> {"lufs": integrated loudness, "sig": source signature,
+#                                  "duration": seconds (if known)}
+_loudness: dict[str, dict] = {}
+_loudness_loaded = False
+_loudness_lock = threading.Lock()
+
 
 def _load_tracks():
     """Load tracks from CSV file or Google Sheets URL."""
@@ -57,3 +66,53 @@ def reload_tracks():
     global _tracks
     _tracks = {}
     _load_tracks()
+
+
+def _load_loudness():
+    """Load measured loudness from the JSON cache file."""
+    global _loudness, _loudness_loaded
+    _loudness_loaded = True
+    try:
+        with open(LOUDNESS_CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            _loudness = data
+        logger.info(f"Loaded loudness for {len(_loudness)} tracks")
+    except FileNotFoundError:
+        logger.info(f"No loudness cache at {LOUDNESS_CACHE_PATH}")
+    except Exception as e:
+        logger.error(f"Failed to load loudness cache: {e}")
+
+
+def get_track_loudness(filename: str) -> dict | None:
+    """Get the loudness entry ({"lufs", "sig", "duration"}) for a track file."""
+    if not _loudness_loaded:
+        _load_loudness()
+    return _loudness.get(filename)
+
+
+def set_track_loudness(filename: str, lufs: float, sig: str, duration: float | None = None):
+    """Record measured integrated loudness (and duration, if known) for a track file."""
+    if not _loudness_loaded:
+        _load_loudness()
+    with _loudness_lock:
+        _loudness[filename] = {"lufs": lufs, "sig": sig, "duration": duration}
+
+
+def set_track_duration(filename: str, duration: float):
+    """Fill in the duration of an already measured track file."""
+    if not _loudness_loaded:
+        _load_loudness()
+    with _loudness_lock:
+        if filename in _loudness:
+            _loudness[filename]["duration"] = duration
+
+
+def save_loudness():
+    """Write the loudness registry to its cache file."""
+    with _loudness_lock:
+        data = dict(_loudness)
+    tmp_path = f"{LOUDNESS_CACHE_PATH}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, LOUDNESS_CACHE_PATH)